@@ -0,0 +1,40 @@
+"""Add post engagement counters
+
+Revision ID: 4f1c2d7e9a10
+Revises: 8360217d1476
+Create Date: 2026-10-17 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c2d7e9a10'
+down_revision: Union[str, Sequence[str], None] = '8360217d1476'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('view_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the source tables
+    op.execute("""
+        UPDATE posts
+        SET
+            like_count = (SELECT count(*) FROM votes WHERE votes.post_id = posts.id),
+            comment_count = (SELECT count(*) FROM comments WHERE comments.post_id = posts.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'view_count')
+    op.drop_column('posts', 'comment_count')
+    op.drop_column('posts', 'like_count')
@@ -0,0 +1,54 @@
+"""Add full-text search vectors and GIN indexes
+
+Revision ID: a3c9e7f1b254
+Revises: f7a9c3d2e815
+Create Date: 2026-10-17 19:12:05.381442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e7f1b254'
+down_revision: Union[str, Sequence[str], None] = 'f7a9c3d2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # comments.search_vector was dropped in 2a7a1599e6c3; bring it back as a generated column
+    op.add_column('comments', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', coalesce(content, ''))", persisted=True),
+        nullable=True
+    ))
+
+    # users.search_vector stays trigger-maintained (same columns as 8ac28f88f20c). Databases whose
+    # tables came from metadata.create_all (app startup) never got the trigger, so make sure it
+    # exists and fill in the rows written without it
+    op.execute('DROP TRIGGER IF EXISTS tsvectorupdate ON users')
+    op.execute("""
+        CREATE TRIGGER tsvectorupdate BEFORE INSERT OR UPDATE
+        ON users FOR EACH ROW EXECUTE FUNCTION
+        tsvector_update_trigger(search_vector, 'pg_catalog.english', username, full_name);
+    """)
+    op.execute("UPDATE users SET search_vector = to_tsvector('english', username || ' ' || full_name) WHERE search_vector IS NULL")
+
+    # The previous GIN indexes were dropped in 2a7a1599e6c3 and 8360217d1476
+    op.create_index('ix_users_search_vector', 'users', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_comments_search_vector', 'comments', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_search_vector', table_name='comments')
+    op.drop_index('ix_posts_search_vector', table_name='posts')
+    op.drop_index('ix_users_search_vector', table_name='users')
+    op.drop_column('comments', 'search_vector')
@@ -0,0 +1,42 @@
+"""Add keyset pagination indexes
+
+Revision ID: a93be1f07c52
+Revises: 4f1c2d7e9a10
+Create Date: 2026-10-17 11:40:03.274918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93be1f07c52'
+down_revision: Union[str, Sequence[str], None] = '4f1c2d7e9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_like_count_id', 'posts', ['like_count', 'id'], unique=False)
+    op.create_index('ix_posts_comment_count_id', 'posts', ['comment_count', 'id'], unique=False)
+    op.create_index('ix_posts_group_id_created_at_id', 'posts', ['group_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_notifications_user_id_created_at_id', 'notifications', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_messages_sender_id_created_at_id', 'messages', ['sender_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_messages_recipient_id_created_at_id', 'messages', ['recipient_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_live_feeds_created_at_id', 'live_feeds', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_live_feeds_created_at_id', table_name='live_feeds')
+    op.drop_index('ix_messages_recipient_id_created_at_id', table_name='messages')
+    op.drop_index('ix_messages_sender_id_created_at_id', table_name='messages')
+    op.drop_index('ix_notifications_user_id_created_at_id', table_name='notifications')
+    op.drop_index('ix_posts_group_id_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_comment_count_id', table_name='posts')
+    op.drop_index('ix_posts_like_count_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
@@ -0,0 +1,36 @@
+"""Add trigram indexes for search suggestions
+
+Revision ID: b8d4f2a6c913
+Revises: a3c9e7f1b254
+Create Date: 2026-10-17 19:48:22.904716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f2a6c913'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e7f1b254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm ships with PostgreSQL's contrib package; creating it needs CREATE on the database
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_users_username_trgm', 'users', ['username'], postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.create_index('ix_users_full_name_trgm', 'users', ['full_name'], postgresql_using='gin', postgresql_ops={'full_name': 'gin_trgm_ops'})
+    op.create_index('ix_posts_title_trgm', 'posts', ['title'], postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_groups_name_trgm', 'groups', ['name'], postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_groups_name_trgm', table_name='groups')
+    op.drop_index('ix_posts_title_trgm', table_name='posts')
+    op.drop_index('ix_users_full_name_trgm', table_name='users')
+    op.drop_index('ix_users_username_trgm', table_name='users')
@@ -0,0 +1,41 @@
+"""Add trending score to posts
+
+Revision ID: c5d82e4b61f3
+Revises: a93be1f07c52
+Create Date: 2026-10-17 14:05:27.903611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d82e4b61f3'
+down_revision: Union[str, Sequence[str], None] = 'a93be1f07c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('trending_updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+    # Seed scores for the last week from the counters, decayed by post age (24h half-life)
+    op.execute("""
+        UPDATE posts
+        SET trending_score = (view_count * 0.5 + like_count * 1.0 + comment_count * 1.5)
+            * power(0.5, extract(epoch FROM now() - created_at) / 86400.0)
+        WHERE created_at >= now() - interval '7 days'
+    """)
+
+    op.create_index('ix_posts_trending_score_id', 'posts', ['trending_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_trending_score_id', table_name='posts')
+    op.drop_column('posts', 'trending_updated_at')
+    op.drop_column('posts', 'trending_score')
@@ -0,0 +1,32 @@
+"""Add token version to users
+
+Revision ID: d1e7a3b9c2f4
+Revises: c5d82e4b61f3
+Create Date: 2026-10-17 16:42:11.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1e7a3b9c2f4'
+down_revision: Union[str, Sequence[str], None] = 'c5d82e4b61f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    # The revocation refresh only reads bumped users
+    op.create_index('ix_users_token_version_bumped', 'users', ['id', 'token_version'], unique=False,
+                    postgresql_where=sa.text('token_version > 0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_token_version_bumped', table_name='users')
+    op.drop_column('users', 'token_version')
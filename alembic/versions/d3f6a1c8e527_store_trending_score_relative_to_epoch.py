@@ -0,0 +1,40 @@
+"""Store trending score relative to a fixed epoch
+
+Revision ID: d3f6a1c8e527
+Revises: b8d4f2a6c913
+Create Date: 2026-10-17 18:42:10.517304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f6a1c8e527'
+down_revision: Union[str, Sequence[str], None] = 'b8d4f2a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Old scores were decayed to trending_updated_at; express them as
+    # log2(score) + half-lives (24h) since 2024-01-01, see app.trending
+    op.execute("""
+        UPDATE posts
+        SET trending_score = log(2.0, trending_score::numeric)::float8
+            + (extract(epoch FROM trending_updated_at) - 1704067200) / 86400.0
+        WHERE trending_score > 0
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        UPDATE posts
+        SET trending_score = power(2.0, greatest(trending_score - (extract(epoch FROM now()) - 1704067200) / 86400.0, -1000)),
+            trending_updated_at = now()
+        WHERE trending_score > 0
+    """)
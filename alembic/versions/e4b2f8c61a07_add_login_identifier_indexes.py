@@ -0,0 +1,33 @@
+"""Add case-insensitive login identifier indexes
+
+Revision ID: e4b2f8c61a07
+Revises: d1e7a3b9c2f4
+Create Date: 2026-10-17 17:20:48.552907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b2f8c61a07'
+down_revision: Union[str, Sequence[str], None] = 'd1e7a3b9c2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if existing rows differ only by case; resolve those before upgrading
+    op.create_index('ix_users_lower_username', 'users', [sa.text('lower(username)')], unique=True)
+    op.create_index('ix_users_lower_email', 'users', [sa.text('lower(email)')], unique=True)
+    op.create_index('ix_users_upper_nin', 'users', [sa.text('upper(nin)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_upper_nin', table_name='users')
+    op.drop_index('ix_users_lower_email', table_name='users')
+    op.drop_index('ix_users_lower_username', table_name='users')
@@ -0,0 +1,45 @@
+"""Generate the user NIN placeholder in the database
+
+Revision ID: f7a9c3d2e815
+Revises: e4b2f8c61a07
+Create Date: 2026-10-17 18:03:36.104552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a9c3d2e815'
+down_revision: Union[str, Sequence[str], None] = 'e4b2f8c61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same format the app used to write in a second UPDATE: NIN<id>-<created_at as YYYYMMDDHHMMSS>.
+    # id and created_at defaults are already applied when a BEFORE INSERT trigger runs.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users_set_nin_placeholder() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.nin IS NULL THEN
+                NEW.nin := 'NIN' || NEW.id || '-' || to_char(NEW.created_at, 'YYYYMMDDHH24MISS');
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER users_nin_placeholder
+        BEFORE INSERT ON users
+        FOR EACH ROW EXECUTE FUNCTION users_set_nin_placeholder()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS users_nin_placeholder ON users")
+    op.execute("DROP FUNCTION IF EXISTS users_set_nin_placeholder()")
@@ -0,0 +1,75 @@
+import logging
+from typing import List
+from .broker import make_broker
+from .cache import MemoryBackend
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Per-worker TTL cache of authenticated principals, keyed by user id, so get_current_user
+    does not hit `users` on every request. Admin changes call invalidate(), which drops the
+    entry here and publishes the id so every other worker drops it too. The TTL bounds how
+    stale an entry can get if an invalidation is missed.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, channel: str):
+        self.ttl = ttl
+        self.backend = MemoryBackend(max_entries=max_entries)
+        self.channel = make_broker(channel, channel="auth_invalidate")
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, user_id: int):
+        if self.ttl <= 0:
+            return None
+        principal = await self.backend.get(f"user:{user_id}")
+        if principal is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return principal
+
+    async def set(self, principal):
+        if self.ttl > 0:
+            await self.backend.set(f"user:{principal.id}", principal, self.ttl)
+
+    async def invalidate(self, user_id: int):
+        await self.backend.delete(f"user:{user_id}")
+        try:
+            await self.channel.publish([{"user_id": user_id}])
+        except Exception as e:
+            # Other workers fall back to the TTL
+            logger.error(f"Failed to publish auth cache invalidation for user_id {user_id}: {e}")
+
+    async def _on_invalidate(self, events: List[dict]):
+        for event in events:
+            await self.backend.delete(f"user:{event['user_id']}")
+            self.invalidations += 1
+
+    async def start(self):
+        await self.channel.start(self._on_invalidate)
+
+    async def stop(self):
+        await self.channel.stop()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "entries": self.backend.size(),
+            "ttl_seconds": self.ttl
+        }
+
+
+user_cache = UserCache(
+    ttl=settings.auth_cache_ttl_seconds,
+    max_entries=settings.auth_cache_max_entries,
+    channel=settings.auth_cache_invalidation
+)
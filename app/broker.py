@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, List, Optional
+from sqlalchemy import text
+from .config import settings
+from .connections import MESSAGES
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[List[dict]], Awaitable[None]]
+
+# Postgres caps NOTIFY payloads at 8000 bytes; stay under it
+MAX_NOTIFY_PAYLOAD = 7500
+
+
+class InMemoryBroker:
+    """Single-process bus: published events go straight to this worker's handler. Used for tests and one-worker setups."""
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    async def publish(self, events: List[dict]):
+        if self._handler is not None and events:
+            await self._handler(events)
+
+
+class PostgresBroker:
+    """
+    Cross-worker bus over LISTEN/NOTIFY. Every worker listens on one channel on a
+    dedicated asyncpg connection and fans received events out to its local sockets.
+    """
+
+    def __init__(self, dsn: str, channel: str = "ws_delivery"):
+        self.dsn = dsn
+        self.channel = channel
+        self._handler: Optional[Handler] = None
+        self._connection = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+        self._stopping = False
+        await self._connect()
+
+    async def _connect(self):
+        import asyncpg
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(self.channel, self._on_notify)
+        self._connection.add_termination_listener(self._on_terminated)
+        logger.info(f"WebSocket broker listening on '{self.channel}'")
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            events = json.loads(payload)
+        except ValueError:
+            logger.error(f"Dropping malformed broker payload: {payload[:200]}")
+            return
+        asyncio.create_task(self._handler(events))
+
+    def _on_terminated(self, connection):
+        if not self._stopping:
+            logger.warning("WebSocket broker connection lost, reconnecting")
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 0.5
+        while not self._stopping:
+            try:
+                await self._connect()
+                return
+            except Exception as e:
+                logger.error(f"WebSocket broker reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def stop(self):
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+
+    async def publish(self, events: List[dict]):
+        from .database import engine
+        payloads = list(self._pack(events))
+        if not payloads:
+            return
+        async with engine.connect() as conn:
+            for payload in payloads:
+                await conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+            await conn.commit()
+
+    def _pack(self, events: List[dict]):
+        """Group events into JSON arrays that each fit in one NOTIFY payload."""
+        batch, size = [], 2
+        for event in events:
+            encoded = json.dumps(event, separators=(",", ":"), default=str)
+            if len(encoded) + 2 > MAX_NOTIFY_PAYLOAD:
+                logger.error(f"WebSocket event for user_id {event.get('user_id')} too large for NOTIFY, dropped")
+                continue
+            if batch and size + len(encoded) + 1 > MAX_NOTIFY_PAYLOAD:
+                yield "[" + ",".join(batch) + "]"
+                batch, size = [], 2
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            yield "[" + ",".join(batch) + "]"
+
+
+def make_broker(kind: str, channel: str = "ws_delivery"):
+    """"memory" or "postgres"; also used for other cross-worker signals such as auth cache invalidation."""
+    if kind == "postgres":
+        return PostgresBroker(settings.database_url.replace("+asyncpg", ""), channel=channel)
+    return InMemoryBroker()
+
+
+broker = make_broker(settings.ws_broker)
+
+
+async def deliver(user_id: int, payload: dict, channel: str = MESSAGES):
+    """Send `payload` to `user_id`'s socket on whichever worker holds it."""
+    await broker.publish([{"user_id": user_id, "channel": channel, "payload": payload}])
+
+
+async def deliver_many(deliveries: List[dict]):
+    """Batch form of deliver(): each item has user_id, channel and payload."""
+    await broker.publish(deliveries)
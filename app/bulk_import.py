@@ -0,0 +1,256 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import time
+from datetime import date
+from typing import Iterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import text
+from . import schemas
+from .config import settings
+from .database import engine
+from .ug_locale import uga_locale, InvalidLocation
+from .utils import PasswordHasher
+
+logger = logging.getLogger(__name__)
+
+# Staging columns, in COPY order. row_no ties merge results back to the uploaded rows.
+STAGING_COLUMNS = [
+    "row_no", "username", "full_name", "email", "password", "role", "region", "district",
+    "constituency", "sub_county", "parish", "village", "gender", "date_of_birth", "phone_number"
+]
+
+CREATE_STAGING = """
+    CREATE TEMP TABLE IF NOT EXISTS user_import (
+        row_no integer NOT NULL,
+        username text NOT NULL,
+        full_name text NOT NULL,
+        email text,
+        password text NOT NULL,
+        role text NOT NULL,
+        region text NOT NULL,
+        district text NOT NULL,
+        constituency text NOT NULL,
+        sub_county text NOT NULL,
+        parish text NOT NULL,
+        village text NOT NULL,
+        gender text NOT NULL,
+        date_of_birth date NOT NULL,
+        phone_number text NOT NULL
+    ) ON COMMIT DELETE ROWS
+"""
+
+# nin comes from the placeholder trigger. ON CONFLICT DO NOTHING with no target skips rows that
+# clash with any unique index, including duplicates within the same batch.
+MERGE_STAGING = """
+    INSERT INTO users (
+        username, full_name, email, password, role, region, district, constituency, sub_county,
+        parish, village, gender, date_of_birth, phone_number, interests,
+        notification_email, notification_sms, notification_push, is_active
+    )
+    SELECT
+        username, full_name, email, password, role, region, district, constituency, sub_county,
+        parish, village, gender, date_of_birth, phone_number, '[]'::jsonb,
+        true, false, true, true
+    FROM user_import
+    ORDER BY row_no
+    ON CONFLICT DO NOTHING
+    RETURNING username
+"""
+
+
+def _clean(value) -> str:
+    return value.strip() if isinstance(value, str) else ("" if value is None else str(value))
+
+
+def validate_row(row: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """Returns (staging values without row_no/hashed password, None) or (None, error)."""
+    username = _clean(row.get("username"))
+    password = _clean(row.get("password"))
+    full_name = _clean(row.get("full_name")) or f"{_clean(row.get('first_name'))} {_clean(row.get('last_name'))}".strip()
+    if not username or not password or not full_name:
+        return None, "username, password and full_name (or first_name/last_name) are required"
+
+    try:
+        role = schemas.Role(_clean(row.get("role")) or schemas.Role.CITIZEN.value)
+    except ValueError:
+        return None, f"Invalid role: {row.get('role')}"
+    if role.value not in settings.user_import_roles:
+        return None, f"Role {role.value} cannot be bulk imported"
+
+    district_id = _clean(row.get("district"))
+    county_id = _clean(row.get("constituency"))
+    subcounty_id = _clean(row.get("sub_county"))
+    parish_id = _clean(row.get("parish"))
+    try:
+        district, county, subcounty, parish = uga_locale.resolve_chain(district_id, county_id, subcounty_id, parish_id)
+    except InvalidLocation as e:
+        return None, str(e)
+
+    try:
+        date_of_birth = date.fromisoformat(_clean(row.get("date_of_birth"))) if _clean(row.get("date_of_birth")) else date(2000, 1, 1)
+    except ValueError:
+        return None, f"Invalid date_of_birth: {row.get('date_of_birth')}"
+
+    return {
+        "username": username,
+        "full_name": full_name,
+        "email": _clean(row.get("email")) or None,
+        "password": password,
+        "role": role.value,
+        "region": _clean(row.get("region")) or "Unknown",
+        "district": district["name"],
+        "constituency": county["name"],
+        "sub_county": subcounty["name"],
+        "parish": parish["name"],
+        "village": _clean(row.get("village")) or "Unknown",
+        "gender": _clean(row.get("gender")) or "Unknown",
+        "date_of_birth": date_of_birth,
+        "phone_number": _clean(row.get("phone_number")) or "0000000000"
+    }, None
+
+
+def iter_rows(upload: UploadFile, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Stream (row_no, row, parse_error) from the spooled upload without reading it all into memory."""
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for row_no, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_no, row, None
+    else:
+        for row_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield row_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield row_no, None, "Each line must be a JSON object"
+                continue
+            yield row_no, row, None
+
+
+def detect_format(upload: UploadFile, fmt: Optional[str]) -> str:
+    fmt = (fmt or "").lower()
+    if not fmt:
+        name = (upload.filename or "").lower()
+        if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (upload.content_type or ""):
+            fmt = "ndjson"
+        else:
+            fmt = "csv"
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="format must be csv or ndjson")
+    return fmt
+
+
+# One process pool for all imports on this worker, started on first use and shut down with the app
+import_hasher = PasswordHasher(
+    workers=settings.user_import_hash_workers or os.cpu_count() or 1,
+    max_queue=settings.user_import_batch_size,
+    kind="process"
+)
+
+# Imports on a worker run one at a time, so a batch always fits the hasher's queue
+_import_lock = asyncio.Lock()
+
+
+class UserImport:
+    """
+    One bulk import run. Rows are parsed and validated in a worker thread, one batch at a
+    time. For each batch, passwords are hashed on the shared process pool, the rows are
+    COPYed into a temp staging table, and then merged into `users` with one
+    INSERT ... SELECT. Every batch commits on its own, so a late failure keeps earlier batches.
+    """
+
+    def __init__(self, batch_size: int, max_errors: int):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.hasher = import_hasher
+        self.received = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, row_no: int, message: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_no, "error": message})
+
+    def _next_batch(self, rows: Iterator[Tuple[int, Optional[dict], Optional[str]]]) -> List[dict]:
+        """Read and validate rows until a batch is full or the upload ends. Runs off the event loop."""
+        batch: List[dict] = []
+        batch_usernames = set()
+        for row_no, row, parse_error in rows:
+            self.received += 1
+            if parse_error:
+                self.error(row_no, parse_error)
+                continue
+            values, error = validate_row(row)
+            if error:
+                self.error(row_no, error)
+                continue
+            # A username repeated within a batch would be indistinguishable in RETURNING
+            if values["username"].lower() in batch_usernames:
+                self.error(row_no, "Duplicate username in upload")
+                continue
+            values["row_no"] = row_no
+            batch.append(values)
+            batch_usernames.add(values["username"].lower())
+            if len(batch) >= self.batch_size:
+                break
+        return batch
+
+    async def _hash_batch(self, batch: List[dict]):
+        # Hand the pool a whole batch at once; bcrypt dominates the import's cost
+        hashes = await asyncio.gather(*(self.hasher.hash(row["password"]) for row in batch))
+        for row, hashed in zip(batch, hashes):
+            row["password"] = hashed
+
+    async def _load_batch(self, conn, batch: List[dict]):
+        await self._hash_batch(batch)
+        async with conn.begin():
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "user_import",
+                records=[tuple(row[c] for c in STAGING_COLUMNS) for row in batch],
+                columns=STAGING_COLUMNS
+            )
+            result = await conn.execute(text(MERGE_STAGING))
+            inserted = {username for (username,) in result}
+        self.imported += len(inserted)
+        for row in batch:
+            if row["username"] not in inserted:
+                self.error(row["row_no"], "Username or email already registered")
+
+    async def run(self, rows: Iterator[Tuple[int, Optional[dict], Optional[str]]]) -> dict:
+        started = time.perf_counter()
+        async with _import_lock:
+            async with engine.connect() as conn:
+                await conn.execute(text(CREATE_STAGING))
+                await conn.commit()
+                while True:
+                    batch = await asyncio.to_thread(self._next_batch, rows)
+                    if not batch:
+                        break
+                    await self._load_batch(conn, batch)
+        elapsed = time.perf_counter() - started
+        logger.info(f"User import: {self.imported}/{self.received} rows imported in {elapsed:.1f}s")
+        return {
+            "received": self.received,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "elapsed_seconds": round(elapsed, 2)
+        }
+
+
+async def import_users(upload: UploadFile, fmt: Optional[str] = None) -> dict:
+    fmt = detect_format(upload, fmt)
+    uga_locale.require_ready()
+    job = UserImport(batch_size=settings.user_import_batch_size, max_errors=settings.user_import_max_errors)
+    return await job.run(iter_rows(upload, fmt))
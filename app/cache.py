@@ -0,0 +1,159 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from fastapi import Request, Response
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    Per-process TTL + LRU store. Also the local stand-in for the shared backend,
+    e.g. in development and tests or with a single worker.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared backend so every worker sees the same entries and version bumps. Needs the `redis` package."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # Optional dependency, only needed when CACHE_BACKEND_URL is set
+        self._redis = redis.from_url(url)
+        self.evictions = None
+        self.expirations = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def incr(self, key: str) -> int:
+        return await self._redis.incr(key)
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._redis.get(key)
+        return int(value) if value is not None else 0
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class ResponseCache:
+    """
+    Caches serialized JSON response bodies.
+
+    Keys are route + normalized query params + visibility scope, prefixed with the current
+    version of every namespace the response depends on. Writers call bump() on those
+    namespaces, so stale entries are simply never read again and age out via TTL/LRU.
+    """
+
+    def __init__(self, backend, default_ttl: float):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def bump(self, *namespaces: str):
+        for namespace in namespaces:
+            await self.backend.incr(f"version:{namespace}")
+
+    async def bump_post(self, post_id: int, group_id: Optional[int] = None):
+        """A post's engagement changed: its detail view, the feeds and its group's listing."""
+        namespaces = ["feed", f"post:{post_id}"]
+        if group_id:
+            namespaces.append(f"group:{group_id}")
+        await self.bump(*namespaces)
+
+    async def key(self, request: Request, namespaces: Iterable[str], scope: str = "public") -> str:
+        versions = []
+        for namespace in namespaces:
+            versions.append(f"{namespace}@{await self.backend.get_counter(f'version:{namespace}')}")
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"response:{','.join(versions)}:{request.url.path}?{params}#{scope}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        body = await self.backend.get(key)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    async def set(self, key: str, body: bytes, ttl: Optional[float] = None):
+        await self.backend.set(key, body, ttl or self.default_ttl)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations,
+            "entries": self.backend.size()
+        }
+
+
+def json_body(content: Any) -> bytes:
+    return json.dumps(content, separators=(",", ":")).encode("utf-8")
+
+
+def cached_json_response(body: bytes, hit: bool = False) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+def _make_backend():
+    if settings.cache_backend_url:
+        logger.info("Using shared response cache backend")
+        return RedisBackend(settings.cache_backend_url)
+    return MemoryBackend(max_entries=settings.cache_max_entries)
+
+
+response_cache = ResponseCache(_make_backend(), default_ttl=settings.cache_ttl_seconds)
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -13,6 +14,70 @@ class Settings(BaseSettings):
     google_client_secret: str
     linkedin_client_id: str
     linkedin_client_secret: str
+    # Default total-count strategy for paginated listings: "exact", "estimated" or "none"
+    pagination_count_mode: str = "exact"
+    # Trending: score half-life (stored scores are scaled by it), how far back posts can trend, and how often stale scores are retired
+    trending_half_life_hours: float = 24.0
+    trending_window_days: int = 7
+    trending_decay_interval_seconds: int = 300
+    # Buffered post views: flush every N seconds or M pending views; optional per-viewer dedupe (0 = off)
+    view_flush_interval_seconds: float = 5.0
+    view_flush_max_pending: int = 1000
+    view_dedupe_window_seconds: int = 0
+    # Response cache: shared backend (e.g. redis://...) or the in-process TTL+LRU store when unset
+    cache_backend_url: Optional[str] = None
+    cache_max_entries: int = 2048
+    cache_ttl_seconds: float = 30.0
+    # Group-post notification fan-out: worker count, queue bound and rows per INSERT
+    fanout_workers: int = 2
+    fanout_queue_size: int = 1000
+    fanout_chunk_size: int = 1000
+    # WebSocket delivery across workers: "memory" (single process) or "postgres" (LISTEN/NOTIFY)
+    ws_broker: str = "memory"
+    # Per-socket outbound queue: size, send timeout, and what to do when full ("drop" oldest or "disconnect")
+    ws_send_queue_size: int = 100
+    ws_send_timeout_seconds: float = 5.0
+    ws_slow_consumer_policy: str = "drop"
+    # Maximum open WebSockets (messaging + notifications) per worker; further connects are refused
+    ws_max_connections: int = 5000
+    # Authenticated-user cache in get_current_user (0 disables); invalidation channel "memory" or "postgres"
+    auth_cache_ttl_seconds: float = 60.0
+    auth_cache_max_entries: int = 10000
+    auth_cache_invalidation: str = "memory"
+    # Stateless auth: role/active/token-version claims in the JWT, revocations refreshed every N seconds
+    auth_stateless: bool = False
+    auth_revocation_refresh_seconds: float = 5.0
+    # bcrypt executor: "thread" or "process", pool size, and calls allowed to wait before shedding with 503
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+    # Shared outbound HTTP client (OAuth providers); OAUTH_MOCK_PROVIDER=true answers locally for tests
+    http_timeout_seconds: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    oauth_mock_provider: bool = False
+    # Admin bulk user import: rows per COPY/merge batch, bcrypt processes (0 = CPU count), errors reported
+    user_import_batch_size: int = 5000
+    user_import_hash_workers: int = 0
+    user_import_max_errors: int = 1000
+    # Roles a bulk import may assign; admin is left out so an upload can't mint administrators
+    user_import_roles: List[str] = ["citizen", "mp", "journalist"]
+    # Download locale data from upstream when the bundled snapshot is missing (off: a missing snapshot is an error)
+    ug_locale_remote_fallback: bool = False
+    # Cache-Control max-age for /locations listings; clients revalidate with If-None-Match after it
+    locations_cache_max_age_seconds: int = 86400
+    # Deepest offset /search pages to; ranked results past this are rarely useful and cost a full rank sort
+    search_max_offset: int = 500
+    # Per-process /search page cache, keyed by normalized tsquery; kept short so new posts show up quickly
+    search_cache_ttl_seconds: float = 15.0
+    search_cache_entries: int = 5000
+    # Most post matches counted for /search facets; beyond it counts cover a sample and report truncated
+    search_facet_max_matches: int = 10000
+    # /search/suggest: max results per type, trigram matches ranked per type, per-process prefix cache
+    search_suggest_max_limit: int = 10
+    search_suggest_candidates: int = 200
+    search_suggest_cache_ttl_seconds: float = 30.0
+    search_suggest_cache_entries: int = 5000
 
     model_config = SettingsConfigDict(
         env_file=".env",  
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+from fastapi import WebSocket
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Delivery channels: which socket registry an event is meant for
+NOTIFICATIONS = "notifications"
+MESSAGES = "messages"
+
+# Slow-consumer policies when a connection's send queue is full
+DROP_OLDEST = "drop"
+DISCONNECT = "disconnect"
+
+
+class Connection:
+    """
+    One client socket. Outbound messages go through a bounded queue that a dedicated
+    writer task drains, so senders never wait on the network.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: int, manager: "ConnectionManager"):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.manager = manager
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=manager.queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.evicted = False
+        self.closed = False
+
+    def start(self):
+        self.writer = asyncio.create_task(self._write())
+
+    def enqueue(self, message: dict) -> bool:
+        """Queue a message without blocking. Returns False if the connection is gone or was cut off."""
+        if self.closed or self.evicted:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.manager.policy == DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.put_nowait(message)
+            self.manager.dropped += 1
+            return True
+        logger.warning(f"WebSocket send queue full for user_id: {self.user_id}, disconnecting slow consumer")
+        self._evict(slow=True)
+        return False
+
+    def _evict(self, slow: bool = False):
+        """Schedule removal from the manager; safe to call from the writer task itself."""
+        if self.evicted:
+            return
+        self.evicted = True
+        if slow:
+            self.manager.slow_disconnects += 1
+            asyncio.create_task(self.manager.disconnect(self, code=1013, reason="Too slow"))
+        else:
+            asyncio.create_task(self.manager.disconnect(self))
+
+    async def _write(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_json(message), timeout=self.manager.send_timeout)
+            except asyncio.TimeoutError:
+                # A cancelled send may leave a half-written frame, so the socket cannot be reused
+                logger.warning(f"WebSocket send timed out for user_id: {self.user_id}, disconnecting")
+                self._evict(slow=True)
+                return
+            except Exception as e:
+                logger.debug(f"WebSocket send failed for user_id: {self.user_id}: {e}")
+                self._evict()
+                return
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if self.closed:
+            return
+        self.closed = True
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass  # Already closed by the client
+
+
+# WebSocket connection manager: every open socket of every user on this worker
+class ConnectionManager:
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        policy: Optional[str] = None
+    ):
+        self.queue_size = queue_size or settings.ws_send_queue_size
+        self.send_timeout = send_timeout or settings.ws_send_timeout_seconds
+        self.policy = policy or settings.ws_slow_consumer_policy
+        self.active_connections: Dict[int, Set[Connection]] = {}
+        self.dropped = 0
+        self.slow_disconnects = 0
+
+    async def connect(self, websocket: WebSocket, user_id: int) -> Connection:
+        await websocket.accept()
+        connection = Connection(websocket, user_id, self)
+        self.active_connections.setdefault(user_id, set()).add(connection)
+        connection.start()
+        logger.debug(f"WebSocket connected for user_id: {user_id} ({len(self.active_connections[user_id])} devices)")
+        return connection
+
+    async def disconnect(self, connection: Connection, code: int = 1000, reason: str = ""):
+        connections = self.active_connections.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.active_connections[connection.user_id]
+        await connection.close(code=code, reason=reason)
+        logger.debug(f"WebSocket disconnected for user_id: {connection.user_id}")
+
+    async def send_message(self, user_id: int, message: dict) -> int:
+        """Queue `message` on every device of `user_id`. Returns how many connections took it."""
+        return sum(connection.enqueue(message) for connection in list(self.active_connections.get(user_id, ())))
+
+    async def broadcast(self, user_ids: List[int], message: dict) -> int:
+        sent = 0
+        for user_id in user_ids:
+            sent += await self.send_message(user_id, message)
+        return sent
+
+    async def close_all(self):
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                await self.disconnect(connection, code=1001, reason="Server shutting down")
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self.active_connections),
+            "connections": sum(len(c) for c in self.active_connections.values()),
+            "queued": sum(c.queue.qsize() for conns in self.active_connections.values() for c in conns),
+            "dropped": self.dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "policy": self.policy
+        }
+
+
+# Sockets attached to *this* worker. Other workers reach them through app.broker.
+manager = ConnectionManager()
+
+# WebSocket for real-time notifications
+notification_manager = ConnectionManager()
+
+_managers = {MESSAGES: manager, NOTIFICATIONS: notification_manager}
+
+# Connects refused because the worker was at ws_max_connections
+rejected_connections = 0
+
+
+def open_connections() -> int:
+    return sum(sum(len(c) for c in m.active_connections.values()) for m in _managers.values())
+
+
+def at_capacity() -> bool:
+    """Check before accepting a socket; counts the refusal if the worker is full."""
+    global rejected_connections
+    if open_connections() >= settings.ws_max_connections:
+        rejected_connections += 1
+        return True
+    return False
+
+
+def socket_stats() -> dict:
+    return {
+        "open": open_connections(),
+        "max": settings.ws_max_connections,
+        "rejected": rejected_connections,
+        MESSAGES: manager.stats(),
+        NOTIFICATIONS: notification_manager.stats()
+    }
+
+
+async def deliver_local(events: List[dict]):
+    """Broker handler: queue each event on the matching sockets on this worker, if any."""
+    for event in events:
+        await _managers[event["channel"]].send_message(event["user_id"], event["payload"])
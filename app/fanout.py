@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+from sqlalchemy import insert, select, literal, false
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .config import settings
+from .broker import deliver_many
+from .connections import NOTIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+
+class GroupPostEvent(NamedTuple):
+    post_id: int
+    group_id: int
+    author_id: int
+    content: str
+    created_at: datetime
+
+
+async def insert_notification_chunk(db: AsyncSession, event: GroupPostEvent, after_user_id: int, chunk_size: int) -> List:
+    """
+    INSERT ... SELECT one chunk of group members (ordered by user_id, after `after_user_id`),
+    server-side, so member rows never travel to the app. Returns (id, user_id, created_at) per notification.
+    """
+    members = select(
+        models.group_members.c.user_id,
+        literal(event.content),
+        false()
+    ).where(
+        models.group_members.c.group_id == event.group_id,
+        models.group_members.c.user_id != event.author_id,
+        models.group_members.c.user_id > after_user_id
+    ).order_by(models.group_members.c.user_id).limit(chunk_size)
+
+    stmt = insert(models.Notification).from_select(
+        ["user_id", "content", "is_read"], members
+    ).returning(models.Notification.id, models.Notification.user_id, models.Notification.created_at)
+    result = await db.execute(stmt)
+    return result.all()
+
+
+class FanoutPipeline:
+    """
+    Background fan-out of group-post notifications. create_post enqueues one event;
+    workers insert the notifications chunk by chunk and publish each chunk to the
+    WebSocket broker, off the request path.
+    """
+
+    def __init__(self, workers: int, queue_size: int, chunk_size: int):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        # Metrics
+        self.events_processed = 0
+        self.events_failed = 0
+        self.notifications_inserted = 0
+        self.pushes_published = 0
+        self.busy_seconds = 0.0
+        self.last_event_seconds: Optional[float] = None
+
+    async def enqueue(self, event: GroupPostEvent):
+        # Waits only if the queue is full, which applies backpressure instead of dropping notifications
+        await self.queue.put(event)
+
+    async def process(self, event: GroupPostEvent):
+        from .database import AsyncSessionLocal
+        started = time.perf_counter()
+        last_user_id = 0
+        async with AsyncSessionLocal() as db:
+            while True:
+                rows = await insert_notification_chunk(db, event, last_user_id, self.chunk_size)
+                await db.commit()
+                if not rows:
+                    break
+                self.notifications_inserted += len(rows)
+                last_user_id = rows[-1].user_id
+                await self.push(event, rows)
+                if len(rows) < self.chunk_size:
+                    break
+        elapsed = time.perf_counter() - started
+        self.busy_seconds += elapsed
+        self.last_event_seconds = elapsed
+
+    async def push(self, event: GroupPostEvent, rows):
+        """Publish one chunk to the broker in a single call; each worker delivers to its own sockets concurrently."""
+        await deliver_many([
+            {
+                "user_id": row.user_id,
+                "channel": NOTIFICATIONS,
+                "payload": {
+                    "id": row.id,
+                    "message": event.content,
+                    "is_read": False,
+                    "post_id": event.post_id,
+                    "group_id": event.group_id,
+                    "created_at": row.created_at.isoformat(),
+                    "user_id": row.user_id
+                }
+            }
+            for row in rows
+        ])
+        self.pushes_published += len(rows)
+
+    async def _worker(self):
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.process(event)
+                self.events_processed += 1
+            except Exception as e:
+                self.events_failed += 1
+                logger.error(f"Fan-out for post {event.post_id} in group {event.group_id} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Fan-out queue not drained on shutdown, {self.queue.qsize()} events left")
+        for task in self._tasks:
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "events_processed": self.events_processed,
+            "events_failed": self.events_failed,
+            "notifications_inserted": self.notifications_inserted,
+            "pushes_published": self.pushes_published,
+            "notifications_per_second": round(self.notifications_inserted / self.busy_seconds, 1) if self.busy_seconds else None,
+            "last_event_seconds": self.last_event_seconds
+        }
+
+
+fanout = FanoutPipeline(
+    workers=settings.fanout_workers,
+    queue_size=settings.fanout_queue_size,
+    chunk_size=settings.fanout_chunk_size
+)
@@ -0,0 +1,57 @@
+import logging
+from typing import Optional
+from urllib.parse import parse_qs
+import httpx
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def mock_oauth_transport() -> httpx.MockTransport:
+    """
+    Stand-in for Google and LinkedIn in local runs and tests: any code is exchanged for a
+    token, and the userinfo endpoints return a profile derived from that code.
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            code = parse_qs(request.content.decode()).get("code", ["mock"])[0]
+            return httpx.Response(200, json={"access_token": f"mock-{code}", "token_type": "Bearer"})
+        token = request.headers.get("Authorization", "").removeprefix("Bearer mock-") or "user"
+        return httpx.Response(200, json={
+            "email": f"{token}@example.com",
+            "name": f"Mock {token}",
+            "given_name": "Mock",
+            "family_name": token
+        })
+    return httpx.MockTransport(handler)
+
+
+def start_http_client():
+    global _client
+    transport = mock_oauth_transport() if settings.oauth_mock_provider else None
+    if transport is not None:
+        logger.warning("Using the mock OAuth provider; no requests leave this process")
+    _client = httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.http_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections
+        )
+    )
+
+
+async def stop_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared, connection-pooled client for outbound calls (OAuth providers). Usable as a dependency."""
+    if _client is None:
+        start_http_client()
+    return _client
@@ -1,13 +1,23 @@
-from fastapi import FastAPI, WebSocket, Depends, HTTPException, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, HTTPException, WebSocketDisconnect, Response
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.ext.asyncio import AsyncSession
 from .routers.oauth2 import get_current_user
-from . import models
-from .database import engine, get_db
+from . import models, trending
+from .database import engine, AsyncSessionLocal
+from .view_counter import view_counter
+from .fanout import fanout
+from .connections import ConnectionManager, manager, notification_manager, deliver_local, at_capacity  # Socket registries live in app.connections
+from .broker import broker, deliver
+from .auth_cache import user_cache
+from .revocation import revocations
+from .config import settings
+from .utils import password_hasher
+from .bulk_import import import_hasher
+from .http_client import start_http_client, stop_http_client
+from .ug_locale import uga_locale
 from .routers import user, post, auth, vote, search, comments, groups, categories, notifications, locations, messages, live_feeds, admin
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict
 import json
+import asyncio
 import logging
 from datetime import datetime
 
@@ -71,54 +81,126 @@ async def create_tables():
         await conn.run_sync(models.Base.metadata.create_all)
     logger.info("Database tables created")
 
-@app.get("/")
-def root():
-    return {"message": "Hello, world"}
+# Background retirement of stale trending scores
+@app.on_event("startup")
+async def start_trending_retirement():
+    app.state.trending_task = asyncio.create_task(trending.run_retire_loop())
+
+@app.on_event("shutdown")
+async def stop_trending_retirement():
+    app.state.trending_task.cancel()
+
+# Buffered post view counts
+@app.on_event("startup")
+async def start_view_counter():
+    view_counter.start()
 
-# WebSocket connection manager for messaging
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, WebSocket] = {}
+@app.on_event("shutdown")
+async def flush_view_counter():
+    await view_counter.stop()
 
-    async def connect(self, websocket: WebSocket, user_id: int):
-        await websocket.accept()
-        self.active_connections[user_id] = websocket
-        logger.debug(f"WebSocket connected for user_id: {user_id}")
+# Cross-worker WebSocket delivery
+@app.on_event("startup")
+async def start_broker():
+    await broker.start(deliver_local)
+
+@app.on_event("shutdown")
+async def stop_broker():
+    await broker.stop()
+    await manager.close_all()
+    await notification_manager.close_all()
 
-    def disconnect(self, user_id: int):
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-            logger.debug(f"WebSocket disconnected for user_id: {user_id}")
+# Cross-worker invalidation of the authenticated-user cache
+@app.on_event("startup")
+async def start_user_cache():
+    await user_cache.start()
 
-    async def send_message(self, user_id: int, message: dict):
-        if user_id in self.active_connections:
-            await self.active_connections[user_id].send_json(message)
-            logger.debug(f"Sent message to user_id: {user_id}, message: {message}")
+@app.on_event("shutdown")
+async def stop_user_cache():
+    await user_cache.stop()
 
-manager = ConnectionManager()
+# Stateless auth: keep the token revocation set fresh
+@app.on_event("startup")
+async def start_revocations():
+    if settings.auth_stateless:
+        revocations.start()
 
-# WebSocket for real-time notifications
-connected_users = {}
+@app.on_event("shutdown")
+async def stop_revocations():
+    await revocations.stop()
+
+@app.on_event("shutdown")
+async def stop_password_hasher():
+    password_hasher.shutdown()
+    import_hasher.shutdown()
+
+# Pooled HTTP client for OAuth providers
+@app.on_event("startup")
+async def open_http_client():
+    start_http_client()
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await stop_http_client()
+
+# Group-post notification fan-out workers
+@app.on_event("startup")
+async def start_fanout():
+    fanout.start()
+
+@app.on_event("shutdown")
+async def stop_fanout():
+    await fanout.stop()
+
+# Locale data loads off the event loop so workers boot immediately
+@app.on_event("startup")
+async def load_locale_data():
+    app.state.locale_task = uga_locale.start_loading()
+
+@app.get("/")
+def root():
+    return {"message": "Hello, world"}
+
+# Readiness probe: 503 until startup data (locations) is loaded
+@app.get("/ready")
+def ready(response: Response):
+    locale = uga_locale.status()
+    if not locale["ready"]:
+        response.status_code = 503
+    return {"ready": locale["ready"], "locale": locale}
+
+async def authenticate_websocket(token: str):
+    """
+    Resolve the socket's user with a session that goes back to the pool straight away.
+    A Depends(get_db) session would stay checked out for the socket's whole lifetime.
+    """
+    async with AsyncSessionLocal() as db:
+        return await get_current_user(token=token, db=db)
+
+async def refuse_if_full(websocket: WebSocket) -> bool:
+    if at_capacity():
+        await websocket.close(code=1013, reason="Server busy")
+        logger.warning("WebSocket refused: worker at ws_max_connections")
+        return True
+    return False
 
 @app.websocket("/ws/notifications")
-async def websocket_notifications(websocket: WebSocket, db: AsyncSession = Depends(get_db)):
+async def websocket_notifications(websocket: WebSocket):
     token = websocket.query_params.get("token")
     if not token:
         await websocket.close(code=1008, reason="Missing token")
         logger.warning("WebSocket closed: Missing token")
         return
+    if await refuse_if_full(websocket):
+        return
     try:
-        current_user = await get_current_user(token=token, db=db)
-        connected_users[current_user.id] = websocket
-        await websocket.accept()
-        logger.debug(f"WebSocket notification connected for user_id: {current_user.id}")
+        current_user = await authenticate_websocket(token)
+        connection = await notification_manager.connect(websocket, current_user.id)
         try:
             while True:
                 await websocket.receive_text()  # Keep connection alive
         except WebSocketDisconnect:
-            if current_user.id in connected_users:
-                del connected_users[current_user.id]
-            await websocket.close()
+            await notification_manager.disconnect(connection)
             logger.debug(f"WebSocket notification disconnected for user_id: {current_user.id}")
     except HTTPException as e:
         await websocket.close(code=1008, reason=f"Unauthorized: {e.detail}")
@@ -126,14 +208,16 @@ async def websocket_notifications(websocket: WebSocket, db: AsyncSession = Depen
 
 # WebSocket for real-time direct messaging
 @app.websocket("/ws/{user_id}")
-async def websocket_messaging(websocket: WebSocket, user_id: int, db: AsyncSession = Depends(get_db)):
+async def websocket_messaging(websocket: WebSocket, user_id: int):
     token = websocket.query_params.get("token")
     if not token:
         await websocket.close(code=1008, reason="Missing token")
         logger.warning("WebSocket closed: Missing token")
         return
+    if await refuse_if_full(websocket):
+        return
     try:
-        current_user = await get_current_user(token=token, db=db)
+        current_user = await authenticate_websocket(token)
         if current_user.id != user_id:
             await websocket.close(code=1008, reason="Unauthorized: user_id mismatch")
             logger.warning(f"WebSocket closed: user_id mismatch, requested {user_id}, got {current_user.id}")
@@ -143,18 +227,18 @@ async def websocket_messaging(websocket: WebSocket, user_id: int, db: AsyncSessi
             logger.warning(f"WebSocket closed: user_id {user_id} is suspended")
             return
 
-        await manager.connect(websocket, user_id)
+        connection = await manager.connect(websocket, user_id)
         try:
             while True:
                 data = await websocket.receive_text()
                 message = json.loads(data)
                 if message.get("type") == "typing":
-                    await manager.send_message(
+                    await deliver(
                         message["recipient_id"],
                         {"type": "typing", "sender_id": user_id}
                     )
                 else:
-                    await manager.send_message(
+                    await deliver(
                         message["recipient_id"],
                         {
                             "sender_id": user_id,
@@ -163,8 +247,7 @@ async def websocket_messaging(websocket: WebSocket, user_id: int, db: AsyncSessi
                         }
                     )
         except WebSocketDisconnect:
-            manager.disconnect(user_id)
-            await websocket.close()
+            await manager.disconnect(connection)
             logger.debug(f"WebSocket messaging disconnected for user_id: {user_id}")
     except HTTPException as e:
         await websocket.close(code=1008, reason=f"Unauthorized: {e.detail}")
@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, Enum, Date
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, Enum, Date, Index, Float, Computed, func
 from sqlalchemy.sql import text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.sql.schema import ForeignKey, Table
+from sqlalchemy.sql.schema import ForeignKey, Table, FetchedValue
 from sqlalchemy.dialects.postgresql import TSVECTOR, JSONB
 import enum
 from sqlalchemy import Enum as SQLEnum  
@@ -39,7 +39,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, nullable=False)
     full_name = Column(String, nullable=False)
-    nin = Column(String, unique=True, nullable=False)
+    # Omitted on insert to get the NIN<id>-<timestamp> placeholder from the users_nin_placeholder trigger
+    nin = Column(String, unique=True, nullable=False, server_default=FetchedValue())
     constituency = Column(String, nullable=False)
     district = Column(String, nullable=False)
     sub_county = Column(String, nullable=False)
@@ -64,7 +65,10 @@ class User(Base):
     # FIXED: Bind to lowercase .value strings from Role Enum
     role = Column(SQLEnum(Role, native_enum=False, values_callable=lambda x: [e.value for e in x]), default=Role.CITIZEN, nullable=False)
     is_active = Column(Boolean, default=True)
-    search_vector = Column(TSVECTOR, nullable=True)
+    # Bumped on suspend/unsuspend/delete/promote; stateless tokens with an older version are revoked
+    token_version = Column(Integer, server_default=text('0'), nullable=False)
+    # Maintained by the tsvectorupdate trigger from username and full_name
+    search_vector = Column(TSVECTOR, server_default=FetchedValue(), server_onupdate=FetchedValue(), nullable=True)
 
     posts = relationship("Post", back_populates="owner")
     comments = relationship("Comment", back_populates="user")
@@ -75,6 +79,19 @@ class User(Base):
     received_messages = relationship("Message", back_populates="recipient", foreign_keys="[Message.recipient_id]")
     live_feeds = relationship("LiveFeed", back_populates="journalist")
 
+    # Revocation refresh reads only users whose token version was bumped
+    __table_args__ = (
+        Index("ix_users_token_version_bumped", "id", "token_version", postgresql_where=text("token_version > 0")),
+        # Login identifiers: one case-insensitive probe each (see app.login_lookup)
+        Index("ix_users_lower_username", func.lower(username), unique=True),
+        Index("ix_users_lower_email", func.lower(email), unique=True),
+        Index("ix_users_upper_nin", func.upper(nin), unique=True),
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes for /search/suggest prefix matching
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}),
+    )
+
 class Post(Base):
     __tablename__ = "posts"
     id = Column(Integer, primary_key=True, index=True)
@@ -84,7 +101,16 @@ class Post(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=True)
     is_active = Column(Boolean, default=True)
-    search_vector = Column(TSVECTOR, nullable=True)
+    search_vector = Column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))", persisted=True)
+    )
+    # Denormalized engagement counters, kept in step by app.post_stats
+    like_count = Column(Integer, server_default=text('0'), default=0, nullable=False)
+    comment_count = Column(Integer, server_default=text('0'), default=0, nullable=False)
+    view_count = Column(Integer, server_default=text('0'), default=0, nullable=False)
+    # Time-decayed engagement score, stored in log2 relative to a fixed epoch; maintained by app.trending
+    trending_score = Column(Float, server_default=text('0'), default=0, nullable=False)
+    trending_updated_at = Column(TIMESTAMP(timezone=True), server_default=text('now()'), nullable=False)
 
     owner = relationship("User", back_populates="posts")
     group = relationship("Group", back_populates="posts")
@@ -92,6 +118,17 @@ class Post(Base):
     votes = relationship("Vote", back_populates="post")
     categories = relationship("Category", secondary=post_categories, back_populates="posts")
 
+    # Keyset pagination indexes: (sort key, id)
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_like_count_id", "like_count", "id"),
+        Index("ix_posts_comment_count_id", "comment_count", "id"),
+        Index("ix_posts_group_id_created_at_id", "group_id", "created_at", "id"),
+        Index("ix_posts_trending_score_id", "trending_score", "id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_posts_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+    )
+
 class Comment(Base):
     __tablename__ = "comments"
     id = Column(Integer, primary_key=True, index=True)
@@ -101,12 +138,17 @@ class Comment(Base):
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
     parent_comment_id = Column(Integer, ForeignKey("comments.id"), nullable=True)
     is_active = Column(Boolean, default=True)
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('english', coalesce(content, ''))", persisted=True))
 
     user = relationship("User", back_populates="comments")
     post = relationship("Post", back_populates="comments")
     parent_comment = relationship("Comment", remote_side=[id])
     replies = relationship("Comment", back_populates="parent_comment")
 
+    __table_args__ = (
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 class Vote(Base):
     __tablename__ = "votes"
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, nullable=False)
@@ -135,6 +177,10 @@ class Group(Base):
     members = relationship("User", secondary=group_members, back_populates="groups")
     posts = relationship("Post", back_populates="group")
 
+    __table_args__ = (
+        Index("ix_groups_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
+
 class Notification(Base):
     __tablename__ = "notifications"
     id = Column(Integer, primary_key=True, index=True)
@@ -145,6 +191,10 @@ class Notification(Base):
 
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
 class Message(Base):
     __tablename__ = "messages"
     id = Column(Integer, primary_key=True, index=True)
@@ -157,6 +207,11 @@ class Message(Base):
     sender = relationship("User", back_populates="sent_messages", foreign_keys=[sender_id])
     recipient = relationship("User", back_populates="received_messages", foreign_keys=[recipient_id])
 
+    __table_args__ = (
+        Index("ix_messages_sender_id_created_at_id", "sender_id", "created_at", "id"),
+        Index("ix_messages_recipient_id_created_at_id", "recipient_id", "created_at", "id"),
+    )
+
 class LiveFeed(Base):
     __tablename__ = "live_feeds"
     id = Column(Integer, primary_key=True, index=True)
@@ -166,4 +221,8 @@ class LiveFeed(Base):
     journalist_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     is_active = Column(Boolean, default=True)
 
-    journalist = relationship("User", back_populates="live_feeds")
\ No newline at end of file
+    journalist = relationship("User", back_populates="live_feeds")
+
+    __table_args__ = (
+        Index("ix_live_feeds_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
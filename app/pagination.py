@@ -0,0 +1,227 @@
+import base64
+import enum
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from .config import settings
+
+
+class CountMode(str, enum.Enum):
+    EXACT = "exact"          # count(*) OVER () in the page query itself
+    ESTIMATED = "estimated"  # planner statistics, no scan
+    NONE = "none"            # no total, only has_more
+
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN [ANALYZE] (FORMAT JSON) <statement>, keeping the statement's bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    options = "ANALYZE, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_count(db: AsyncSession, query=None, table: Optional[str] = None) -> Optional[int]:
+    """
+    Row estimate without scanning: pg_class.reltuples for an unfiltered table,
+    otherwise the planner's row estimate for `query`.
+    """
+    if table is not None:
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": table}
+        )
+        estimate = result.scalar()
+        # -1 / 0 means the table has never been analyzed; ask the planner instead
+        if estimate and estimate > 0:
+            return int(estimate)
+    if query is None:
+        return None
+    result = await db.execute(explain(query.order_by(None).limit(None).offset(None)))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _load(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: List[Any], direction: str = "next", total: Optional[int] = None) -> str:
+    payload = {"k": [_dump(v) for v in values], "d": direction}
+    if total is not None:
+        payload["t"] = total
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[List[Any], str, Optional[int]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_load(v) for v in payload["k"]]
+        direction = payload.get("d", "next")
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        total = payload.get("t")
+        return values, direction, int(total) if total is not None else None
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) pagination over an ordered, unique key such as (created_at, id).
+    Requests without a cursor fall back to offset mode so existing `skip` clients keep working,
+    but every page hands out cursors so the next page is an index seek rather than a scan.
+
+    Totals follow `count_mode`. In exact mode the count is a window function on the
+    first (or offset) page and is then carried inside the cursors, so later pages never recount.
+    """
+
+    def __init__(
+        self,
+        *columns,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10,
+        descending: bool = True,
+        count_mode: Optional[CountMode] = None
+    ):
+        self.columns = columns
+        self.cursor = cursor
+        self.skip = skip
+        self.limit = limit
+        self.descending = descending
+        self.count_mode = CountMode(count_mode or settings.pagination_count_mode)
+        self.direction = "next"
+        self.values = None
+        self.total_count = None
+        self.has_more = False
+        self.next_cursor = None
+        self.prev_cursor = None
+        self._windowed = False
+        if cursor:
+            self.values, self.direction, self.total_count = decode_cursor(cursor)
+            if len(self.values) != len(columns):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    def apply(self, query):
+        if self.values is not None:
+            # Walking forward through a descending listing means smaller keys, and vice versa
+            if (self.direction == "next") == self.descending:
+                query = query.where(tuple_(*self.columns) < tuple_(*self.values))
+            else:
+                query = query.where(tuple_(*self.columns) > tuple_(*self.values))
+        elif self.skip:
+            query = query.offset(self.skip)
+
+        if self.count_mode == CountMode.EXACT and self.values is None:
+            # Window is evaluated before OFFSET/LIMIT, so this is the full total
+            query = query.add_columns(func.count().over().label("total_count"))
+            self._windowed = True
+
+        # Previous pages are read in reverse order and flipped back in paginate()
+        order_desc = self.descending != (self.direction == "prev")
+        query = query.order_by(*[c.desc() if order_desc else c.asc() for c in self.columns])
+        # One extra row tells us whether there is another page
+        return query.limit(self.limit + 1)
+
+    def key(self, row) -> List[Any]:
+        return [getattr(row, c.key) for c in self.columns]
+
+    def paginate(self, result) -> Tuple[List[Any], Optional[str], Optional[str]]:
+        """Takes the Result of the query built by apply()."""
+        if self._windowed:
+            rows = result.all()
+            if rows:
+                self.total_count = rows[0].total_count
+            elif not self.skip:
+                self.total_count = 0
+            rows = [row[0] for row in rows]
+        else:
+            rows = list(result.scalars().all())
+
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if self.direction == "prev":
+            rows.reverse()
+        if not rows:
+            return rows, None, None
+
+        total = self.total_count if self.count_mode == CountMode.EXACT else None
+        if self.direction == "next":
+            self.next_cursor = encode_cursor(self.key(rows[-1]), total=total) if has_more else None
+            has_previous = self.values is not None or self.skip > 0
+            self.prev_cursor = encode_cursor(self.key(rows[0]), "prev", total) if has_previous else None
+        else:
+            self.next_cursor = encode_cursor(self.key(rows[-1]), total=total)
+            self.prev_cursor = encode_cursor(self.key(rows[0]), "prev", total) if has_more else None
+        self.has_more = self.next_cursor is not None
+        return rows, self.next_cursor, self.prev_cursor
+
+    async def count(self, db: AsyncSession, query=None, table: Optional[str] = None) -> Optional[int]:
+        """
+        Total for the listing under the current count mode. Pass `table` only when
+        the listing is unfiltered, so the reltuples shortcut is valid.
+        """
+        if self.count_mode == CountMode.ESTIMATED:
+            self.total_count = await estimate_count(db, query, table)
+        elif self.count_mode == CountMode.NONE:
+            self.total_count = None
+        return self.total_count
+
+    def metadata(self, request: Request) -> dict:
+        """The `pagination` block of the list envelope."""
+        return {
+            "total_count": self.total_count,
+            "count_mode": self.count_mode.value,
+            "has_more": self.has_more,
+            "limit": self.limit,
+            "skip": self.skip,
+            "next": cursor_url(request, self.next_cursor),
+            "previous": cursor_url(request, self.prev_cursor),
+            "next_cursor": self.next_cursor,
+            "previous_cursor": self.prev_cursor
+        }
+
+
+def cursor_url(request: Request, cursor: Optional[str]) -> Optional[str]:
+    """Same path and filters as the current request, positioned at `cursor`."""
+    if cursor is None:
+        return None
+    params = [(k, v) for k, v in request.query_params.multi_items() if k not in ("skip", "cursor")]
+    params.append(("cursor", cursor))
+    return f"{request.url.path}?{urlencode(params)}"
+
+
+def set_link_header(response: Response, next_url: Optional[str], prev_url: Optional[str]):
+    """For endpoints that return a bare list: expose the page links as an RFC 8288 Link header."""
+    links = []
+    if next_url:
+        links.append(f'<{next_url}>; rel="next"')
+    if prev_url:
+        links.append(f'<{prev_url}>; rel="prev"')
+    if links:
+        response.headers["Link"] = ", ".join(links)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import update, select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .trending import engagement_weight, score_update_values
+
+logger = logging.getLogger(__name__)
+
+
+async def bump_post_counters(
+    db: AsyncSession,
+    post_id: int,
+    likes: int = 0,
+    comments: int = 0,
+    views: int = 0
+) -> Optional[dict]:
+    """
+    Adjust the denormalized engagement counters on a post.
+    Runs inside the caller's transaction (the caller commits) and returns the
+    updated counters, or None if the post does not exist.
+    """
+    values = {}
+    if likes:
+        values["like_count"] = models.Post.like_count + likes
+    if comments:
+        values["comment_count"] = models.Post.comment_count + comments
+    if views:
+        values["view_count"] = models.Post.view_count + views
+    # The trending score moves with the counters, in the same statement
+    weight = engagement_weight(likes=likes, comments=comments, views=views)
+    if weight:
+        values.update(score_update_values(weight))
+
+    stmt = update(models.Post).where(models.Post.id == post_id)
+    if values:
+        stmt = stmt.values(**values)
+    else:
+        # Nothing to change, just read the current counters back
+        stmt = stmt.values(like_count=models.Post.like_count)
+    stmt = stmt.returning(
+        models.Post.like_count, models.Post.comment_count, models.Post.view_count, models.Post.group_id
+    ).execution_options(synchronize_session=False)
+
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return {
+        "like_count": row.like_count,
+        "comment_count": row.comment_count,
+        "view_count": row.view_count,
+        "group_id": row.group_id
+    }
+
+
+async def reconcile_post_counters(db: AsyncSession) -> int:
+    """
+    Rebuild like_count and comment_count from the votes and comments tables.
+    Only rows that drifted are rewritten. view_count has no source table and is left alone.
+    Returns the number of posts corrected.
+    """
+    like_counts = select(func.count()).select_from(models.Vote).where(
+        models.Vote.post_id == models.Post.id
+    ).scalar_subquery()
+    comment_counts = select(func.count()).select_from(models.Comment).where(
+        models.Comment.post_id == models.Post.id
+    ).scalar_subquery()
+
+    stmt = update(models.Post).where(
+        or_(models.Post.like_count != like_counts, models.Post.comment_count != comment_counts)
+    ).values(
+        like_count=like_counts,
+        comment_count=comment_counts
+    ).execution_options(synchronize_session=False)
+
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+async def _main():
+    from .database import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        fixed = await reconcile_post_counters(db)
+    logger.info(f"Reconciled engagement counters for {fixed} posts")
+    print(f"Reconciled engagement counters for {fixed} posts")
+
+
+# Backfill / reconcile: python -m app.post_stats
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import secrets
+import sys
+import time
+from datetime import date
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, schemas
+from .utils import hash_async
+
+logger = logging.getLogger(__name__)
+
+# Candidate usernames checked per round trip when provisioning an OAuth user
+USERNAME_CANDIDATES = 8
+
+
+def username_candidates(base_username: str, count: int = USERNAME_CANDIDATES) -> List[str]:
+    """The plain name first, then random-suffixed variants like the old retry loop produced."""
+    return [base_username] + [f"{base_username}{secrets.token_hex(4)}" for _ in range(count - 1)]
+
+
+async def pick_free_username(db: AsyncSession, base_username: str) -> str:
+    """One probe of the lower(username) index for all candidates; the first free one wins."""
+    while True:
+        candidates = username_candidates(base_username)
+        result = await db.execute(
+            select(func.lower(models.User.username)).where(
+                func.lower(models.User.username).in_([c.lower() for c in candidates])
+            )
+        )
+        taken = set(result.scalars().all())
+        for candidate in candidates:
+            if candidate.lower() not in taken:
+                return candidate
+
+
+async def insert_user(db: AsyncSession, values: dict) -> models.User:
+    """
+    INSERT ... RETURNING the full row in one round trip. `nin` is left out unless given,
+    so the database fills in the NIN<id>-<timestamp> placeholder. Raises IntegrityError on
+    a unique violation; the caller decides how to report it.
+    """
+    stmt = insert(models.User).values(**values).returning(models.User)
+    result = await db.execute(stmt)
+    return result.scalar_one()
+
+
+# SQLSTATE for unique_violation; other integrity errors (NOT NULL, FK, CHECK) are bugs, not conflicts
+UNIQUE_VIOLATION = "23505"
+
+
+def is_unique_violation(error: IntegrityError) -> bool:
+    """True for duplicate-key errors, from the adapted DBAPI error or the asyncpg error behind it."""
+    for source in (error.orig, getattr(error.orig, "__cause__", None)):
+        if getattr(source, "sqlstate", None) == UNIQUE_VIOLATION or getattr(source, "pgcode", None) == UNIQUE_VIOLATION:
+            return True
+    return False
+
+
+def unique_violation_field(error: IntegrityError) -> str:
+    """Which user field a unique violation was on, from the violated constraint or index name."""
+    cause = getattr(error.orig, "__cause__", None)
+    constraint = getattr(cause, "constraint_name", None) or str(error.orig)
+    for field in ("username", "email", "nin"):
+        if field in constraint:
+            return field
+    return "user"
+
+
+async def create_account(db: AsyncSession, values: dict) -> models.User:
+    """
+    Signup write path: the unique indexes do the uniqueness checks inside the INSERT itself,
+    so there is no SELECT beforehand and no race between check and insert. Commits and
+    returns the row; a duplicate username or email becomes a 409, and any other integrity
+    error is re-raised.
+    """
+    try:
+        user = await insert_user(db, values)
+        await db.commit()
+        return user
+    except IntegrityError as e:
+        await db.rollback()
+        if not is_unique_violation(e):
+            raise
+        field = unique_violation_field(e)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{field.capitalize()} already registered")
+
+
+async def provision_oauth_user(db: AsyncSession, email: str, full_name: str) -> models.User:
+    """
+    Find the user for an OAuth login by email (case-insensitively, matching the lower(email)
+    unique index), or create a citizen account with placeholder profile fields.
+    """
+    result = await db.execute(select(models.User).where(func.lower(models.User.email) == email.lower()))
+    user = result.scalar_one_or_none()
+    if user:
+        return user
+
+    base_username = full_name.lower().replace(" ", "_")
+    password = await hash_async(secrets.token_hex(16))
+    for attempt in range(3):
+        username = await pick_free_username(db, base_username)
+        try:
+            user = await insert_user(db, {
+                "username": username,
+                "full_name": full_name,
+                "email": email,
+                "password": password,
+                "role": schemas.Role.CITIZEN,
+                "gender": "Unknown",
+                "date_of_birth": date(2000, 1, 1),
+                "phone_number": "0000000000",
+                "region": "Unknown",
+                "district": "Unknown",
+                "constituency": "Unknown",
+                "sub_county": "Unknown",
+                "parish": "Unknown",
+                "village": "Unknown",
+                "interests": [],
+                "notification_email": True,
+                "notification_sms": False,
+                "notification_push": True
+            })
+            await db.commit()
+            return user
+        except IntegrityError as e:
+            # Lost a race for the username, or the same email signed up concurrently
+            await db.rollback()
+            if not is_unique_violation(e):
+                raise
+            result = await db.execute(select(models.User).where(func.lower(models.User.email) == email.lower()))
+            user = result.scalar_one_or_none()
+            if user:
+                return user
+            logger.debug(f"Username {username} taken concurrently, retrying (attempt {attempt + 1})")
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Could not allocate a unique username, please retry")
+
+
+async def _benchmark(count: int):
+    """Insert `count` synthetic signups through create_account's INSERT in one transaction, then roll back."""
+    from .database import AsyncSessionLocal
+    from .utils import hash
+    password = hash("benchmark-password")  # bcrypt is measured separately (see /admin/hashing/stats)
+    run = secrets.token_hex(4)
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        for i in range(count):
+            await insert_user(db, {
+                "username": f"bench_{run}_{i}",
+                "full_name": "Benchmark User",
+                "email": f"bench_{run}_{i}@example.com",
+                "password": password,
+                "role": schemas.Role.CITIZEN,
+                "gender": "Unknown",
+                "date_of_birth": date(2000, 1, 1),
+                "phone_number": "0000000000",
+                "region": "Unknown",
+                "district": "Unknown",
+                "constituency": "Unknown",
+                "sub_county": "Unknown",
+                "parish": "Unknown",
+                "village": "Unknown"
+            })
+        elapsed = time.perf_counter() - started
+        await db.rollback()
+    print(f"{count} signups in {elapsed:.2f}s: {count / elapsed:.0f}/s, {elapsed / count * 1000:.2f} ms each (rolled back)")
+
+
+# Bulk signup throughput: python -m app.provisioning [count]
+if __name__ == "__main__":
+    asyncio.run(_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
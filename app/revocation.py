@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+from sqlalchemy import select
+from . import models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocations:
+    """
+    For stateless tokens: the current token version of every user whose version was ever
+    bumped. A token whose `ver` claim is below it is revoked. Admin actions update this
+    worker at once; other workers catch up on the next background refresh.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self.versions: Dict[int, int] = {}
+        self.refreshes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        return version < self.versions.get(user_id, 0)
+
+    def revoke(self, user_id: int, version: int):
+        """Record a bump made on this worker without waiting for the next refresh."""
+        if version > self.versions.get(user_id, 0):
+            self.versions[user_id] = version
+
+    async def refresh(self):
+        from .database import AsyncSessionLocal
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.User.id, models.User.token_version).where(models.User.token_version > 0)
+            )
+            self.versions = {row.id: row.token_version for row in result}
+        self.refreshes += 1
+
+    async def run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Token revocation refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "revoked_users": len(self.versions),
+            "refreshes": self.refreshes,
+            "refresh_interval_seconds": self.refresh_interval
+        }
+
+
+revocations = TokenRevocations(refresh_interval=settings.auth_revocation_refresh_seconds)
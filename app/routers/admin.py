@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
 from .. import models, schemas
-from ..schemas import Role  # Import Role for require_role
-from ..database import get_db
-from .permissions import require_role
+from ..schemas import Role  # Import Role for role_required
+from ..database import get_db, pool_stats
+from .permissions import role_required
+from ..pagination import KeysetPaginator, CountMode, cursor_url, set_link_header
+from ..cache import response_cache
+from ..fanout import fanout
+from ..connections import socket_stats
+from ..auth_cache import user_cache
+from ..revocation import revocations
+from ..utils import password_hasher
+from ..bulk_import import import_users
+from ..search import search_cache, suggestion_cache, tsquery_cache
 
 router = APIRouter(
     prefix="/admin",
@@ -14,21 +23,42 @@ router = APIRouter(
 
 @router.get("/users", response_model=List[schemas.UserOut])
 async def get_all_users(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: schemas.UserOut = Depends(lambda: require_role([Role.ADMIN])),  
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN])),
     limit: int = 100,
-    skip: int = 0
+    skip: int = 0,
+    cursor: Optional[str] = None
 ):
-    query = select(models.User).offset(skip).limit(limit)
-    result = await db.execute(query)
-    users = result.scalars().all()
+    paginator = KeysetPaginator(
+        models.User.id, cursor=cursor, skip=skip, limit=limit, descending=False, count_mode=CountMode.NONE
+    )
+    result = await db.execute(paginator.apply(select(models.User)))
+    users, next_cursor, prev_cursor = paginator.paginate(result)
+    set_link_header(response, cursor_url(request, next_cursor), cursor_url(request, prev_cursor))
     return users
 
+@router.post("/users/import", response_model=dict)
+async def bulk_import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    """
+    Create many users from a CSV (header row) or NDJSON upload. Columns: username, password,
+    full_name or first_name/last_name, email, role, region, district, constituency, sub_county,
+    parish, village, gender, date_of_birth, phone_number. Location fields are ug_locale IDs.
+    Valid rows are imported; the rest come back as per-row errors. Roles are limited to
+    USER_IMPORT_ROLES (admin is not importable by default).
+    """
+    return await import_users(file, format)
+
 @router.post("/users/{user_id}/suspend", response_model=schemas.UserOut)
 async def suspend_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: schemas.UserOut = Depends(lambda: require_role([Role.ADMIN]))  # FIXED: Lambda wrapper for async dep
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
 ):
     # Fetch user to suspend
     result = await db.execute(
@@ -43,7 +73,10 @@ async def suspend_user(
     
     # Suspend user (set is_active = False)
     db_user.is_active = False
+    db_user.token_version = (db_user.token_version or 0) + 1
     await db.commit()
+    await user_cache.invalidate(user_id)
+    revocations.revoke(user_id, db_user.token_version)
     await db.refresh(db_user)
     return db_user
 
@@ -51,7 +84,7 @@ async def suspend_user(
 async def unsuspend_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: schemas.UserOut = Depends(lambda: require_role([Role.ADMIN]))  # Lambda for unsuspend
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
 ):
     # Fetch user to unsuspend
     result = await db.execute(
@@ -63,7 +96,10 @@ async def unsuspend_user(
     
     # Unsuspend user (set is_active = True)
     db_user.is_active = True
+    db_user.token_version = (db_user.token_version or 0) + 1
     await db.commit()
+    await user_cache.invalidate(user_id)
+    revocations.revoke(user_id, db_user.token_version)
     await db.refresh(db_user)
     return db_user
 
@@ -71,7 +107,7 @@ async def unsuspend_user(
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: schemas.UserOut = Depends(lambda: require_role([Role.ADMIN]))  # Lambda for delete
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
 ):
     # Fetch user to delete
     result = await db.execute(
@@ -86,7 +122,10 @@ async def delete_user(
     
     # Soft delete: Set is_active = False (or use await db.delete(db_user) for hard delete)
     db_user.is_active = False
+    db_user.token_version = (db_user.token_version or 0) + 1
     await db.commit()
+    await user_cache.invalidate(user_id)
+    revocations.revoke(user_id, db_user.token_version)
     return None
 
 # Optional: Other admin endpoints (e.g., promote to role)
@@ -95,7 +134,7 @@ async def promote_user(
     user_id: int,
     new_role: Role,  # e.g., "mp" or Role.MP
     db: AsyncSession = Depends(get_db),
-    current_user: schemas.UserOut = Depends(lambda: require_role([Role.ADMIN]))
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
 ):
     result = await db.execute(
         select(models.User).where(models.User.id == user_id)
@@ -105,15 +144,66 @@ async def promote_user(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
     db_user.role = new_role
+    db_user.token_version = (db_user.token_version or 0) + 1
     await db.commit()
+    await user_cache.invalidate(user_id)
+    revocations.revoke(user_id, db_user.token_version)
     await db.refresh(db_user)
     return db_user
 
 
+@router.get("/cache/stats", response_model=dict)
+async def get_cache_stats(
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    return response_cache.stats()
+
+
+@router.get("/fanout/stats", response_model=dict)
+async def get_fanout_stats(
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    return fanout.stats()
+
+
+@router.get("/auth-cache/stats", response_model=dict)
+async def get_auth_cache_stats(
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    return {**user_cache.stats(), "revocations": revocations.stats()}
+
+
+@router.get("/hashing/stats", response_model=dict)
+async def get_hashing_stats(
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    return password_hasher.stats()
+
+
+@router.get("/search/stats", response_model=dict)
+async def get_search_stats(
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    """Search caches on this worker; `coalesced` counts requests that shared another's query."""
+    return {
+        "search": search_cache.stats(),
+        "suggest": suggestion_cache.stats(),
+        "normalization": tsquery_cache.stats()
+    }
+
+
+@router.get("/ws/stats", response_model=dict)
+async def get_websocket_stats(
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
+):
+    """Open sockets on this worker next to DB pool checkouts; sockets should not hold connections."""
+    return {"sockets": socket_stats(), "db_pool": pool_stats()}
+
+
 @router.post("/modules", response_model=dict)
 async def add_module(
     module: dict,
     db: AsyncSession = Depends(get_db),
-    current_user: schemas.UserOut = Depends(lambda: require_role([Role.ADMIN]))
+    current_user: schemas.UserOut = Depends(role_required([Role.ADMIN]))
 ):
     return {"message": f"Module {module.get('name')} added successfully"}
\ No newline at end of file
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
 from .. import models, schemas
 from ..database import get_db
 from .permissions import require_role
+from ..cache import response_cache, cached_json_response, json_body
 # Optional: from ..schemas import Role  # If you want to use Role.CITIZEN directly
 
 router = APIRouter(
@@ -28,14 +29,25 @@ async def create_category(
     db.add(db_category)
     await db.commit()
     await db.refresh(db_category)
+    await response_cache.bump("categories")
     return db_category
 
 @router.get("/", response_model=List[schemas.CategoryResponse])
 async def get_categories(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     limit: int = 100,  # Added optional pagination
     skip: int = 0
 ):
+    cache_key = await response_cache.key(request, ["categories"])
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(cached, hit=True)
+
     categories_query = select(models.Category).offset(skip).limit(limit)
     categories_result = await db.execute(categories_query)
-    return categories_result.scalars().all()
\ No newline at end of file
+    categories = categories_result.scalars().all()
+
+    body = json_body([schemas.CategoryResponse.model_validate(c).model_dump(mode="json") for c in categories])
+    await response_cache.set(cache_key, body)
+    return cached_json_response(body)
\ No newline at end of file
@@ -8,6 +8,10 @@ from typing import List
 from .. import models, schemas
 from ..routers import oauth2
 from ..database import get_db
+from ..post_stats import bump_post_counters
+from ..cache import response_cache
+from ..broker import deliver
+from ..connections import NOTIFICATIONS
 import os
 
 UPLOAD_DIR = Path("Uploads/comments")
@@ -63,31 +67,30 @@ async def create_comment(
         media_url=media_url
     )
     db.add(db_comment)
+    await bump_post_counters(db, post_id, comments=1)
     await db.commit()
+    await response_cache.bump_post(post.id, post.group_id)
 
     # Notify post owner (if not the commenter)
     if post.owner_id != current_user.id:
         notification = models.Notification(
             user_id=post.owner_id,
-            message=f"New comment on your post '{post.title_of_the_post}' by {current_user.username}",
-            post_id=post_id
+            content=f"New comment on your post '{post.title_of_the_post}' by {current_user.username}"
         )
         db.add(notification)
         await db.commit()
         await db.refresh(notification)  # Refresh to get notification.id
         
         # Send WebSocket notification
-        from ..main import connected_users
-        if post.owner_id in connected_users:
-            await connected_users[post.owner_id].send_json({
-                "id": notification.id,
-                "message": notification.message,
-                "is_read": notification.is_read,
-                "post_id": notification.post_id,
-                "group_id": notification.group_id,
-                "created_at": notification.created_at.isoformat(),
-                "user_id": post.owner_id
-            })
+        await deliver(post.owner_id, {
+            "id": notification.id,
+            "message": notification.content,
+            "is_read": notification.is_read,
+            "post_id": post.id,
+            "group_id": post.group_id,
+            "created_at": notification.created_at.isoformat(),
+            "user_id": post.owner_id
+        }, channel=NOTIFICATIONS)
 
     await db.refresh(db_comment, attribute_names=["user"])
     return db_comment
@@ -149,5 +152,8 @@ async def delete_comment(
             file_path.unlink()
 
     await db.delete(db_comment)
+    counters = await bump_post_counters(db, db_comment.post_id, comments=-1)
     await db.commit()
+    if counters:
+        await response_cache.bump_post(db_comment.post_id, counters["group_id"])
     return None
\ No newline at end of file
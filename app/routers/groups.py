@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, insert
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 from .. import models, schemas
 from ..routers import oauth2
 from ..database import get_db
 from fastapi.responses import JSONResponse
+from ..pagination import KeysetPaginator, CountMode
+from ..cache import response_cache, cached_json_response, json_body
 
 router = APIRouter(
     prefix="/groups",
@@ -87,6 +89,9 @@ async def join_group(id: int, db: AsyncSession = Depends(get_db), current_user:
         insert(models.group_members).values(group_id=id, user_id=db_user.id)
     )
     await db.commit()
+    # The joiner's cached feed pages are keyed by their group set, which just changed;
+    # bump the group itself so anything derived from its membership is rebuilt too
+    await response_cache.bump(f"group:{id}")
 
     # Refresh group with owner and members
     group_query = select(models.Group).where(models.Group.id == id).options(
@@ -100,45 +105,50 @@ async def join_group(id: int, db: AsyncSession = Depends(get_db), current_user:
 
 
 @router.get("/{id}/posts", response_model=None)
-async def get_group_posts(id: int, db: AsyncSession = Depends(get_db), limit: int = 10, skip: int = 0):
+async def get_group_posts(
+    id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    limit: int = 10,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    count_mode: Optional[CountMode] = None
+):
+    cache_key = await response_cache.key(request, [f"group:{id}"])
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(cached, hit=True)
+
     group_query = select(models.Group).where(models.Group.id == id)
     group_result = await db.execute(group_query)
     if not group_result.scalar_one_or_none():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
     
-    count_query = select(func.count()).select_from(models.Post).where(models.Post.group_id == id)
-    count_result = await db.execute(count_query)
-    total_count = count_result.scalar()
-
+    paginator = KeysetPaginator(
+        models.Post.created_at, models.Post.id, cursor=cursor, skip=skip, limit=limit, count_mode=count_mode
+    )
     posts_query = select(models.Post).where(models.Post.group_id == id).options(
         selectinload(models.Post.owner), selectinload(models.Post.categories)
-    ).offset(skip).limit(limit)
-    posts_result = await db.execute(posts_query)
-    posts = posts_result.scalars().all()
-
-    result = []
-    for post in posts:
-        like_query = select(func.count()).select_from(models.Vote).where(models.Vote.post_id == post.id)
-        comment_query = select(func.count()).select_from(models.Comment).where(models.Comment.post_id == post.id)
-        like_result = await db.execute(like_query)
-        comment_result = await db.execute(comment_query)
-        likes = like_result.scalar()
-        comments = comment_result.scalar()
-        result.append({"post": post, "like": likes, "comment_count": comments})
-    
-    next_url = f"/groups/{id}/posts?limit={limit}&skip={skip + limit}" if skip + limit < total_count else None
-    prev_url = f"/groups/{id}/posts?limit={limit}&skip={skip - limit}" if skip > 0 else None
+    )
+    posts_result = await db.execute(paginator.apply(posts_query))
+    posts, _, _ = paginator.paginate(posts_result)
+    await paginator.count(db, posts_query)
+
+    result = [
+        {
+            "post": schemas.Post.model_validate(post).model_dump(mode="json"),
+            "like": post.like_count,
+            "comment_count": post.comment_count
+        }
+        for post in posts
+    ]
     
-    return JSONResponse(content={
+    body = json_body({
         "data": result,
-        "pagination": {
-            "total_count": total_count,
-            "limit": limit,
-            "skip": skip,
-            "next": next_url,
-            "previous": prev_url
-        }
+        "pagination": paginator.metadata(request)
     })
+    await response_cache.set(cache_key, body)
+    return cached_json_response(body)
 
 
 
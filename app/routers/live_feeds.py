@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List, Optional
@@ -6,6 +6,7 @@ from .. import models, schemas
 from ..schemas import Role  # Import Role for require_role
 from ..database import get_db
 from .permissions import require_role
+from ..pagination import KeysetPaginator, CountMode, cursor_url, set_link_header
 
 router = APIRouter(
     prefix="/live-feeds",
@@ -14,16 +15,23 @@ router = APIRouter(
 
 @router.get("/", response_model=List[schemas.LiveFeedResponse])
 async def get_live_feeds(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     limit: int = 20,
     skip: int = 0,
+    cursor: Optional[str] = None,
     active_only: bool = True  # Optional filter for ongoing streams
 ):
-    query = select(models.LiveFeed).offset(skip).limit(limit)
+    paginator = KeysetPaginator(
+        models.LiveFeed.created_at, models.LiveFeed.id, cursor=cursor, skip=skip, limit=limit, count_mode=CountMode.NONE
+    )
+    query = select(models.LiveFeed)
     if active_only:
         query = query.where(models.LiveFeed.is_active == True)  # Assuming model has is_active
-    result = await db.execute(query)
-    live_feeds = result.scalars().all()
+    result = await db.execute(paginator.apply(query))
+    live_feeds, next_cursor, prev_cursor = paginator.paginate(result)
+    set_link_header(response, cursor_url(request, next_cursor), cursor_url(request, prev_cursor))
     return live_feeds
 
 @router.get("/{feed_id}", response_model=schemas.LiveFeedResponse)
@@ -1,51 +1,92 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
 from pydantic import BaseModel
-from ..ug_locale import uga_locale, Location
+from ..config import settings
+from ..ug_locale import uga_locale, Location, LEVEL_LABELS
 
-router = APIRouter(prefix="/locations", tags=["Locations"])
+def locale_ready():
+    uga_locale.require_ready()
+
+router = APIRouter(prefix="/locations", tags=["Locations"], dependencies=[Depends(locale_ready)])
 
 class Location(BaseModel):
     id: str
     name: str
 
+def listing_response(request: Request, listing: tuple) -> Response:
+    """
+    Serve pre-serialized listing bytes with a strong ETag (the snapshot version), answering
+    304 with no body when the client already holds that version.
+    """
+    etag, body = listing
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.locations_cache_max_age_seconds}"
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def empty_listing() -> tuple:
+    etag, _ = uga_locale.listing()
+    return etag, b"[]"
+
 @router.get("/districts", response_model=List[Location])
-async def get_districts():
-    return uga_locale.get_districts()
+async def get_districts(request: Request):
+    return listing_response(request, uga_locale.listing())
 
 @router.get("/counties/{district_id}", response_model=List[Location])
-async def get_counties(district_id: str):
+async def get_counties(district_id: str, request: Request):
     district = uga_locale.find_district_by_id(district_id)
     if not district:
         raise HTTPException(status_code=404, detail=f"District with id '{district_id}' not found")
-    return uga_locale.get_counties(district_id)
+    return listing_response(request, uga_locale.listing("districts", district_id) or empty_listing())
 
 @router.get("/sub-counties/{county_id}", response_model=List[Location])
-async def get_sub_counties(county_id: str):
+async def get_sub_counties(county_id: str, request: Request):
     county = uga_locale.find_county_by_id(county_id)
     if not county:
         raise HTTPException(status_code=404, detail=f"County with id '{county_id}' not found")
-    sub_counties = uga_locale.get_sub_counties(county_id)
+    sub_counties = uga_locale.listing("counties", county_id)
     if not sub_counties:
         raise HTTPException(status_code=404, detail=f"No sub-counties found for county id '{county_id}'")
-    return sub_counties
+    return listing_response(request, sub_counties)
 
 @router.get("/parishes/{sub_county_id}", response_model=List[Location])
-async def get_parishes(sub_county_id: str):
+async def get_parishes(sub_county_id: str, request: Request):
     subcounty = uga_locale.find_subcounty_by_id(sub_county_id)
     if not subcounty:
         raise HTTPException(status_code=404, detail=f"Sub-county with id '{sub_county_id}' not found")
-    parishes = uga_locale.get_parishes(sub_county_id)
+    parishes = uga_locale.listing("subcounties", sub_county_id)
     if not parishes:
         raise HTTPException(status_code=404, detail=f"No parishes found for sub-county id '{sub_county_id}'")
-    return parishes
+    return listing_response(request, parishes)
 
 @router.get("/villages/{parish_id}", response_model=List[Location])
-async def get_villages(parish_id: str):
+async def get_villages(parish_id: str, request: Request):
     parish = uga_locale.find_parish_by_id(parish_id)
     if not parish:
         raise HTTPException(status_code=404, detail=f"Parish with id '{parish_id}' not found")
-    villages = uga_locale.get_villages(parish_id)
+    villages = uga_locale.listing("parishes", parish_id)
     if not villages:
         raise HTTPException(status_code=404, detail=f"No villages found for parish id '{parish_id}'")
-    return villages
\ No newline at end of file
+    return listing_response(request, villages)
+
+# Level filter values accepted by /search, mapped to the store's level names
+SEARCH_LEVELS = {label: level for level, label in LEVEL_LABELS.items()}
+
+@router.get("/search", response_model=List[dict])
+async def search_locations(
+    q: str = Query(..., min_length=2, description="Name prefix, e.g. 'Kira'"),
+    limit: int = Query(20, ge=1, le=100),
+    level: Optional[List[str]] = Query(None, description="Restrict to district, county, sub_county, parish or village")
+):
+    """Typeahead over all five levels; each hit carries its ancestry path from the district down."""
+    levels = None
+    if level:
+        unknown = [l for l in level if l not in SEARCH_LEVELS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown level(s): {', '.join(unknown)}")
+        levels = [SEARCH_LEVELS[l] for l in level]
+    return uga_locale.search(q, limit=limit, levels=levels)
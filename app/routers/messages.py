@@ -1,7 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime
 from .. import models, schemas
@@ -9,17 +8,18 @@ from ..database import get_db
 from ..routers.oauth2 import get_current_user
 from ..schemas import Role
 from fastapi.responses import JSONResponse
+from ..pagination import KeysetPaginator, CountMode
+from ..broker import deliver
+from ..connections import MESSAGES, NOTIFICATIONS
 
 router = APIRouter(
     prefix="/messages",
     tags=["Messages"]
 )
 
-# Lazy import to avoid circular import
+# Routed through the broker so the recipient gets it whichever worker holds their socket
 async def send_message(user_id: int, message: dict):
-    from ..main import manager, connected_users  # Import both manager and connected_users
-    await manager.send_message(user_id, message)
-    return connected_users  # Return for use in create_message
+    await deliver(user_id, message, channel=MESSAGES)
 
 @router.post("/", response_model=schemas.MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_message(
@@ -30,13 +30,19 @@ async def create_message(
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is suspended")
 
+    # Location can change after the token or cached principal was issued, so read it from the row
+    result = await db.execute(
+        select(models.User.full_name, models.User.constituency).where(models.User.id == current_user.id)
+    )
+    sender = result.one()
+
     # Auto-route to MP if recipient_id not provided
     recipient_id = message.recipient_id
     if recipient_id is None:
         # Find MP for user's constituency
         result = await db.execute(
             select(models.User).where(
-                models.User.constituency == current_user.constituency,
+                models.User.constituency == sender.constituency,
                 models.User.role == Role.MP.value,
                 models.User.is_active == True
             )
@@ -45,7 +51,7 @@ async def create_message(
         if not mp:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"No active MP found for constituency {current_user.constituency}"
+                detail=f"No active MP found for constituency {sender.constituency}"
             )
         recipient_id = mp.id
 
@@ -73,7 +79,7 @@ async def create_message(
     await db.refresh(db_message)
 
     # Send WebSocket message
-    connected_users = await send_message(recipient_id, {
+    await send_message(recipient_id, {
         "sender_id": current_user.id,
         "content": message.content,
         "created_at": db_message.created_at.isoformat(),
@@ -83,7 +89,7 @@ async def create_message(
     # Create notification for MP
     notification = models.Notification(
         user_id=recipient_id,
-        content=f"New message from {current_user.full_name} in {current_user.constituency}",
+        content=f"New message from {sender.full_name} in {sender.constituency}",
         created_at=datetime.utcnow(),
         is_read=False
     )
@@ -91,40 +97,26 @@ async def create_message(
     await db.commit()
 
     # Send WebSocket notification (if connected)
-    if recipient_id in connected_users:
-        await connected_users[recipient_id].send_json({
-            "type": "notification",
-            "content": notification.content,
-            "created_at": notification.created_at.isoformat(),
-            "is_read": False
-        })
+    await deliver(recipient_id, {
+        "type": "notification",
+        "content": notification.content,
+        "created_at": notification.created_at.isoformat(),
+        "is_read": False
+    }, channel=NOTIFICATIONS)
 
     return db_message
 
 @router.get("/", response_model=None)  # Use JSONResponse for pagination
 async def get_messages(
+    request: Request,
     constituency: Optional[str] = None,
     current_user: schemas.UserOut = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     limit: int = 50,
-    skip: int = 0
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    count_mode: Optional[CountMode] = None
 ):
-    # Count total messages for pagination
-    count_query = select(func.count()).select_from(models.Message)
-    if current_user.role == Role.MP and constituency:
-        count_query = count_query.join(models.User, models.Message.sender_id == models.User.id).where(
-            models.User.constituency == constituency,
-            models.Message.recipient_id == current_user.id,
-            models.User.is_active == True
-        )
-    else:
-        count_query = count_query.join(models.User, models.Message.sender_id == models.User.id).where(
-            (models.Message.sender_id == current_user.id) | (models.Message.recipient_id == current_user.id),
-            models.User.is_active == True
-        )
-    count_result = await db.execute(count_query)
-    total_count = count_result.scalar()
-
     # Fetch messages
     query = select(models.Message)
     if current_user.role == Role.MP and constituency:
@@ -138,26 +130,20 @@ async def get_messages(
             (models.Message.sender_id == current_user.id) | (models.Message.recipient_id == current_user.id),
             models.User.is_active == True
         )
-    query = query.order_by(models.Message.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    messages = result.scalars().all()
+    paginator = KeysetPaginator(
+        models.Message.created_at, models.Message.id, cursor=cursor, skip=skip, limit=limit, count_mode=count_mode
+    )
+    result = await db.execute(paginator.apply(query))
+    messages, _, _ = paginator.paginate(result)
+    await paginator.count(db, query)
 
     # Convert ORM to Pydantic for serialization
     message_schemas = [schemas.MessageResponse.model_validate(msg) for msg in messages]
 
     # Pagination metadata
-    next_url = f"/messages/?limit={limit}&skip={skip + limit}" if skip + limit < total_count else None
-    prev_url = f"/messages/?limit={limit}&skip={skip - limit}" if skip > 0 else None
-
     return JSONResponse(content={
         "data": [msg.dict() for msg in message_schemas],
-        "pagination": {
-            "total_count": total_count,
-            "limit": limit,
-            "skip": skip,
-            "next": next_url,
-            "previous": prev_url
-        }
+        "pagination": paginator.metadata(request)
     })
 
 @router.patch("/{message_id}/read", response_model=schemas.MessageResponse)
@@ -184,7 +170,7 @@ async def mark_message_read(
     await db.refresh(db_message)
     
     # Notify sender via WebSocket
-    connected_users = await send_message(db_message.sender_id, {
+    await send_message(db_message.sender_id, {
         "type": "read_receipt",
         "message_id": db_message.id,
         "is_read": True,
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
 from .. import models, schemas
 from ..database import get_db
 from ..routers.oauth2 import get_current_user
 from datetime import datetime
 from fastapi.responses import JSONResponse
 from .permissions import require_role
+from ..pagination import KeysetPaginator, CountMode, cursor_url, set_link_header
+from ..broker import deliver
+from ..connections import NOTIFICATIONS
 
 
 router = APIRouter(
@@ -15,24 +18,30 @@ router = APIRouter(
     tags=["Notifications"]
 )
 
-# Lazy import for WebSocket
+# Routed through the broker so it reaches the user's socket on any worker
 async def send_notification(user_id: int, notification: dict):
-    from ..main import connected_users  
-    if user_id in connected_users:
-        await connected_users[user_id].send_json(notification)
+    await deliver(user_id, notification, channel=NOTIFICATIONS)
 
 @router.get("/", response_model=List[schemas.NotificationResponse])
 async def get_notifications(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: schemas.UserOut = Depends(get_current_user),
     limit: int = 10,
-    skip: int = 0
+    skip: int = 0,
+    cursor: Optional[str] = None
 ):
+    paginator = KeysetPaginator(
+        models.Notification.created_at, models.Notification.id, cursor=cursor, skip=skip, limit=limit, count_mode=CountMode.NONE
+    )
     query = select(models.Notification).where(
         models.Notification.user_id == current_user.id
-    ).order_by(models.Notification.created_at.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    notifications = result.scalars().all()
+    )
+    result = await db.execute(paginator.apply(query))
+    notifications, next_cursor, prev_cursor = paginator.paginate(result)
+    # Body stays a plain list; page cursors travel in the Link header
+    set_link_header(response, cursor_url(request, next_cursor), cursor_url(request, prev_cursor))
     return notifications
 
 @router.post("/", response_model=schemas.NotificationResponse, status_code=status.HTTP_201_CREATED)
@@ -6,6 +6,8 @@ from sqlalchemy.future import select
 from .. import schemas, models
 from ..database import get_db
 from ..config import settings
+from ..auth_cache import user_cache
+from ..revocation import revocations
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -15,23 +17,61 @@ SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
-def create_access_token(data: dict):
+# User columns copied into the principal that get_current_user returns (and caches)
+PRINCIPAL_FIELDS = (
+    "id", "username", "full_name", "email", "created_at", "role", "is_active", "profile_image",
+    "region", "district", "constituency", "sub_county", "parish", "village",
+    "notification_email", "notification_sms", "notification_push"
+)
+
+def create_access_token(data: dict, user: Optional[models.User] = None):
     to_encode = data.copy()
+    if user is not None and settings.auth_stateless:
+        # Enough to authorize without a users lookup; `ver` lets admin actions revoke it. Profile fields
+        # that can change (name, location) stay out, so routers needing them read the row.
+        to_encode.update({
+            "username": user.username,
+            "role": user.role.value if isinstance(user.role, schemas.Role) else user.role,
+            "active": bool(user.is_active),
+            "ver": user.token_version or 0
+        })
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_access_token(token: str, credentials_exception: HTTPException):
+def decode_access_token(token: str, credentials_exception: HTTPException) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id = payload.get("user_id")
-        if id is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(id=str(id))
-        return token_data
     except JWTError:
         raise credentials_exception
+    if payload.get("user_id") is None:
+        raise credentials_exception
+    return payload
+
+def verify_access_token(token: str, credentials_exception: HTTPException):
+    payload = decode_access_token(token, credentials_exception)
+    return schemas.TokenData(id=str(payload["user_id"]))
+
+def principal_from_claims(payload: dict, credentials_exception: HTTPException) -> schemas.UserOut:
+    """Stateless mode: the principal comes from the token, checked against the revocation set."""
+    user_id = int(payload["user_id"])
+    if revocations.is_revoked(user_id, int(payload.get("ver", 0))):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        role = schemas.Role(payload["role"])
+    except ValueError:
+        raise credentials_exception
+    return schemas.UserOut.model_construct(
+        id=user_id,
+        username=payload.get("username"),
+        role=role,
+        is_active=bool(payload.get("active", False))
+    )
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
@@ -40,19 +80,26 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token_data = verify_access_token(token, credentials_exception)
-    user_query = select(models.User).where(models.User.id == int(token_data.id))
+    payload = decode_access_token(token, credentials_exception)
+    if settings.auth_stateless and "role" in payload:
+        return principal_from_claims(payload, credentials_exception)
+
+    user_id = int(payload["user_id"])
+    principal = await user_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user_query = select(models.User).where(models.User.id == user_id)
     user_result = await db.execute(user_query)
     user = user_result.scalar_one_or_none()
 
     if user is None:
         raise credentials_exception
 
-    return schemas.UserOut(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        created_at=user.created_at
-    )
+    # Built from a trusted row, so skip validation. Cached principals are all routers ever
+    # see, so this carries every profile field they read (never the password hash).
+    principal = schemas.UserOut.model_construct(**{field: getattr(user, field) for field in PRINCIPAL_FIELDS})
+    await user_cache.set(principal)
+    return principal
 
 
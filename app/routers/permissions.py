@@ -33,6 +33,15 @@ async def require_role(
         )
     return user
 
+def role_required(roles: List[Role]):
+    """
+    Dependency factory around require_role: `Depends(role_required([Role.ADMIN]))`.
+    FastAPI resolves get_current_user for the returned function and awaits the check.
+    """
+    async def dependency(user: UserOut = Depends(get_current_user)) -> UserOut:
+        return await require_role(roles, user=user, db=None)
+    return dependency
+
 async def require_admin_or_self(
     user_id: int,
     user: UserOut = Depends(get_current_user),
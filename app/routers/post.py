@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func, insert
@@ -10,7 +10,12 @@ from ..database import get_db
 from sqlalchemy.orm import selectinload
 from fastapi.responses import JSONResponse
 from .permissions import require_role
-from ..routers.oauth2 import get_current_user 
+from ..routers.oauth2 import get_current_user, verify_access_token
+from ..view_counter import view_counter
+from ..trending import WINDOW as TRENDING_WINDOW
+from ..cache import response_cache, cached_json_response, json_body
+from ..fanout import fanout, GroupPostEvent
+from ..pagination import KeysetPaginator, CountMode
 import urllib.parse  # For URL encoding in share links
 
 router = APIRouter(
@@ -21,10 +26,13 @@ router = APIRouter(
 # Get all posts endpoint with pagination 
 @router.get("/", response_model=None)  # Use JSONResponse for pagination
 async def get_posts(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: schemas.UserOut = Depends(get_current_user),
     limit: int = 10,
     skip: int = 0,
+    cursor: Optional[str] = None,  # Opaque keyset cursor from a previous page
+    count_mode: Optional[CountMode] = None,  # "exact", "estimated" or "none"; server default otherwise
     category_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
@@ -34,41 +42,27 @@ async def get_posts(
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is suspended")
 
-    # Build query with relationships and counts
-    query = select(
-        models.Post,
-        func.count(models.Vote.post_id).label("like_count"),
-        func.count(models.Comment.post_id).label("comment_count")
-    ).options(
+    # Build query with relationships; counts come from the denormalized counters
+    query = select(models.Post).options(
         selectinload(models.Post.owner),
         selectinload(models.Post.categories)
-    ).outerjoin(
-        models.Vote, models.Vote.post_id == models.Post.id
-    ).outerjoin(
-        models.Comment, models.Comment.post_id == models.Post.id
-    ).group_by(models.Post.id)
+    )
 
-    count_query = select(func.count()).select_from(models.Post)
+    # Visibility scope for the response cache: what this caller is allowed to see
+    scope = current_user.role.value
 
     # Apply filters
     if category_id:
         query = query.join(models.post_categories).where(models.post_categories.c.category_id == category_id)
-        count_query = count_query.join(models.post_categories).where(models.post_categories.c.category_id == category_id)
     if start_date:
         query = query.where(models.Post.created_at >= start_date)
-        count_query = count_query.where(models.Post.created_at >= start_date)
     if end_date:
         query = query.where(models.Post.created_at <= end_date)
-        count_query = count_query.where(models.Post.created_at <= end_date)
     if current_user.role == Role.MP and constituency:
         query = query.join(models.User, models.Post.owner_id == models.User.id).where(
             models.User.constituency == constituency,
             models.User.is_active == True
         )
-        count_query = count_query.join(models.User, models.Post.owner_id == models.User.id).where(
-            models.User.constituency == constituency,
-            models.User.is_active == True
-        )
     elif current_user.role == Role.CITIZEN:
         # Filter for public posts or posts in user's groups
         result = await db.execute(
@@ -76,60 +70,47 @@ async def get_posts(
         )
         user_groups = result.scalars().all()
         group_ids = [group.id for group in user_groups]
+        scope = f"{scope}:{','.join(str(group_id) for group_id in sorted(group_ids))}"
         if group_ids:
             query = query.where(
                 (models.Post.group_id.is_(None)) | (models.Post.group_id.in_(group_ids))
             )
-            count_query = count_query.where(
-                (models.Post.group_id.is_(None)) | (models.Post.group_id.in_(group_ids))
-            )
 
-    # Apply sorting
-    if sort_by == "newest":
-        query = query.order_by(models.Post.created_at.desc())
-    elif sort_by == "likes":
-        query = query.order_by(func.count(models.Vote.post_id).desc())
-    elif sort_by == "comments":
-        query = query.order_by(func.count(models.Comment.post_id).desc())
-    else:
-        query = query.order_by(models.Post.created_at.desc())
+    cache_key = await response_cache.key(request, ["feed"], scope=scope)
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(cached, hit=True)
 
-    # Execute count query
-    count_result = await db.execute(count_query)
-    total_count = count_result.scalar()
+    # Apply sorting; the id tie-breaker makes the key unique for cursor pagination
+    if sort_by == "likes":
+        sort_key = models.Post.like_count
+    elif sort_by == "comments":
+        sort_key = models.Post.comment_count
+    else:  # "newest" and default
+        sort_key = models.Post.created_at
+    paginator = KeysetPaginator(sort_key, models.Post.id, cursor=cursor, skip=skip, limit=limit, count_mode=count_mode)
 
-    # Fetch posts
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    posts_data = result.all()
+    # Fetch posts (exact totals ride along in the same query)
+    result = await db.execute(paginator.apply(query))
+    posts_data, _, _ = paginator.paginate(result)
+    await paginator.count(db, query, table="posts" if query.whereclause is None else None)
 
     # Convert to Pydantic models
     result = [
         {
-            "post": schemas.Post.model_validate(post),
-            "like": like_count,
-            "comment_count": comment_count
+            "post": schemas.Post.model_validate(post).model_dump(mode="json"),
+            "like": post.like_count,
+            "comment_count": post.comment_count
         }
-        for post, like_count, comment_count in posts_data
+        for post in posts_data
     ]
 
-    # Pagination metadata
-    next_url = f"/posts/?limit={limit}&skip={skip + limit}" if skip + limit < total_count else None
-    prev_url = f"/posts/?limit={limit}&skip={skip - limit}" if skip > 0 else None
-
-    return JSONResponse(content={
-        "data": [  # Convert Pydantic post to dict for JSON
-            {"post": item["post"].dict(), "like": item["like"], "comment_count": item["comment_count"]}
-            for item in result
-        ],
-        "pagination": {
-            "total_count": total_count,
-            "limit": limit,
-            "skip": skip,
-            "next": next_url,
-            "previous": prev_url
-        }
+    body = json_body({
+        "data": result,
+        "pagination": paginator.metadata(request)
     })
+    await response_cache.set(cache_key, body)
+    return cached_json_response(body)
 
 
 # Create post endpoint 
@@ -141,17 +122,19 @@ async def create_post(
 ):
     # Validate group if provided
     if post.group_id:
-        group_query = select(models.Group).where(models.Group.id == post.group_id).options(selectinload(models.Group.members))
+        group_query = select(models.Group).where(models.Group.id == post.group_id)
         group_result = await db.execute(group_query)
         group = group_result.scalar_one_or_none()
         if not group:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Group not found")
         
-        # Check if user is a group member
-        user_query = select(models.User).where(models.User.id == current_user.id)
-        user_result = await db.execute(user_query)
-        db_user = user_result.scalar_one_or_none()
-        if not db_user or db_user not in group.members:
+        # Check if user is a group member (single row probe instead of loading the member list)
+        member_query = select(models.group_members.c.user_id).where(
+            models.group_members.c.group_id == post.group_id,
+            models.group_members.c.user_id == current_user.id
+        )
+        member_result = await db.execute(member_query)
+        if member_result.scalar_one_or_none() is None:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You must be a group member to post in this group")
 
     # Validate categories
@@ -182,86 +165,86 @@ async def create_post(
             )
         await db.commit()
 
-    # Notify group members if post is in a group
+    # Notify group members in the background (see app.fanout)
     if post.group_id:
-        group_query = select(models.Group).where(models.Group.id == post.group_id).options(selectinload(models.Group.members))
-        group_result = await db.execute(group_query)
-        group = group_result.scalar_one_or_none()
-        if group:
-            for member in group.members:
-                if member.id != current_user.id:  # Skip the post creator
-                    notification = models.Notification(
-                        user_id=member.id,
-                        message=f"New post '{post.title_of_the_post}' in group '{group.name}' by {current_user.username}",
-                        group_id=post.group_id,
-                        post_id=db_post.id
-                    )
-                    db.add(notification)
-                    # Send WebSocket notification (ensure connected_users is accessible)
-                    from ..main import connected_users
-                    if member.id in connected_users:
-                        await connected_users[member.id].send_json({
-                            "id": notification.id,
-                            "message": notification.message,
-                            "is_read": notification.is_read,
-                            "post_id": notification.post_id,
-                            "group_id": notification.group_id,
-                            "created_at": db_post.created_at.isoformat(),
-                            "user_id": member.id
-                        })
-            await db.commit()
+        await fanout.enqueue(GroupPostEvent(
+            post_id=db_post.id,
+            group_id=post.group_id,
+            author_id=current_user.id,
+            content=f"New post '{post.title_of_the_post}' in group '{group.name}' by {current_user.username}",
+            created_at=db_post.created_at
+        ))
+
+    await response_cache.bump_post(db_post.id, db_post.group_id)
 
     await db.refresh(db_post, attribute_names=["categories"])
     return db_post
 
-# Trending posts endpoint (uncommented and fixed with JSONResponse for consistency)
+# Trending posts endpoint: one indexed top-K read over the materialized score (see app.trending).
+# Every post in the window is listed; ones nobody has engaged with yet (score 0) follow, newest first.
 @router.get("/trending", response_model=None)
-async def get_trending_posts(db: AsyncSession = Depends(get_db), limit: int = 10, skip: int = 0):
-    seven_days_ago = func.now() - func.interval('7 days')
-    count_query = select(func.count()).select_from(models.Post).where(models.Post.created_at >= seven_days_ago)
-    count_result = await db.execute(count_query)
-    total_count = count_result.scalar()
+async def get_trending_posts(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    limit: int = 10,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    count_mode: Optional[CountMode] = None
+):
+    cache_key = await response_cache.key(request, ["feed"])
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(cached, hit=True)
 
-    posts_query = select(models.Post).where(models.Post.created_at >= seven_days_ago).options(
+    paginator = KeysetPaginator(
+        models.Post.trending_score, models.Post.id, cursor=cursor, skip=skip, limit=limit, count_mode=count_mode
+    )
+    posts_query = select(models.Post).where(models.Post.created_at >= func.now() - TRENDING_WINDOW).options(
         selectinload(models.Post.owner), selectinload(models.Post.categories)
     )
-    posts_result = await db.execute(posts_query)
-    posts = posts_result.scalars().all()
-
-    trending_posts = []
-    for post in posts:
-        like_query = select(func.count()).select_from(models.Vote).where(models.Vote.post_id == post.id)
-        comment_query = select(func.count()).select_from(models.Comment).where(models.Comment.post_id == post.id)
-        like_result = await db.execute(like_query)
-        comment_result = await db.execute(comment_query)
-        likes = like_result.scalar()
-        comments = comment_result.scalar()
-        score = post.view_count * 0.5 + likes * 1.0 + comments * 1.5
-        trending_posts.append((post, likes, comments, score))
-
-    trending_posts.sort(key=lambda x: x[3], reverse=True)
-    # Apply skip/limit after sorting for pagination
-    paginated_posts = trending_posts[skip:skip + limit]
-    result = [{"post": post, "like": likes, "comment_count": comments} for post, likes, comments, _ in paginated_posts]
-
-    next_url = f"/posts/trending?limit={limit}&skip={skip + limit}" if skip + limit < total_count else None
-    prev_url = f"/posts/trending?limit={limit}&skip={skip - limit}" if skip > 0 else None
-    
-    return JSONResponse(content={
-        "data": result,
-        "pagination": {
-            "total_count": total_count,
-            "limit": limit,
-            "skip": skip,
-            "next": next_url,
-            "previous": prev_url
+    posts_result = await db.execute(paginator.apply(posts_query))
+    posts, _, _ = paginator.paginate(posts_result)
+    await paginator.count(db, posts_query)
+
+    result = [
+        {
+            "post": schemas.Post.model_validate(post).model_dump(mode="json"),
+            "like": post.like_count,
+            "comment_count": post.comment_count
         }
+        for post in posts
+    ]
+
+    body = json_body({
+        "data": result,
+        "pagination": paginator.metadata(request)
     })
+    await response_cache.set(cache_key, body)
+    return cached_json_response(body)
+
+def _viewer_key(request: Request) -> Optional[str]:
+    """Identity used to dedupe repeat views: the token's user id, else the client address."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.lower().startswith("bearer "):
+        try:
+            token_data = verify_access_token(auth_header[7:], HTTPException(status_code=status.HTTP_401_UNAUTHORIZED))
+            return f"user:{token_data.id}"
+        except HTTPException:
+            pass
+    return f"ip:{request.client.host}" if request.client else None
 
 # Get single post 
 @router.get("/{id}", response_model=schemas.PostLike)
-async def get_post(id: int, db: AsyncSession = Depends(get_db)):
-    # Fetch post and increment view count
+async def get_post(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # Views are buffered and flushed in batches (see app.view_counter); the read path never commits
+    viewer = _viewer_key(request) if view_counter.dedupe_window else None
+
+    cache_key = await response_cache.key(request, [f"post:{id}"])
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        view_counter.record(id, viewer)
+        return cached_json_response(cached, hit=True)
+
     post_query = select(models.Post).where(models.Post.id == id).options(
         selectinload(models.Post.owner), selectinload(models.Post.categories)
     )
@@ -270,20 +253,16 @@ async def get_post(id: int, db: AsyncSession = Depends(get_db)):
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
     
-    # Update view_count
-    post.view_count += 1
-    db.add(post)
-    await db.commit()
+    view_counter.record(id, viewer)
 
-    # Get like and comment counts
-    like_query = select(func.count()).select_from(models.Vote).where(models.Vote.post_id == id)
-    comment_query = select(func.count()).select_from(models.Comment).where(models.Comment.post_id == id)
-    like_result = await db.execute(like_query)
-    comment_result = await db.execute(comment_query)
-    likes = like_result.scalar()
-    comments = comment_result.scalar()
-
-    return {"post": post, "like": likes, "comment_count": comments}
+    # Add buffered views to the serialized copy only; the tracked row must not carry them
+    data = schemas.PostLike.model_validate(
+        {"post": post, "like": post.like_count, "comment_count": post.comment_count}
+    )
+    data.post.view_count += view_counter.pending_for(id)
+    body = data.model_dump_json().encode("utf-8")
+    await response_cache.set(cache_key, body)
+    return cached_json_response(body)
 
 
 #Sharing endpoint
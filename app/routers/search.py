@@ -1,41 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.sql import func
-from sqlalchemy.orm import selectinload
-from typing import List
-from .. import models, schemas
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Query
+from datetime import date
+from typing import List, Optional
+from .. import schemas
+from ..config import settings
+from ..search import SEARCH_TYPES, SUGGEST_TYPES, PostFilters, run_search, run_suggest
 
 router = APIRouter(
     prefix="/search",
     tags=["Search"]
 )
 
+def parse_types(types: Optional[List[str]], allowed=SEARCH_TYPES) -> List[str]:
+    """`types=users,posts` or repeated `types=`; all types when absent."""
+    if not types:
+        return list(allowed)
+    requested = [t.strip() for value in types for t in value.split(",") if t.strip()]
+    unknown = [t for t in requested if t not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search type(s): {', '.join(unknown)}")
+    return [t for t in allowed if t in requested]
+
 @router.get("/", response_model=schemas.SearchResponse)
-async def search(query: str, db: AsyncSession = Depends(get_db)):
+async def search(
+    query: str,
+    types: Optional[List[str]] = Query(None, description="users, posts and/or comments; comma-separated or repeated"),
+    skip: int = Query(0, ge=0, le=settings.search_max_offset),
+    limit: int = Query(20, ge=1, le=50),
+    category: Optional[int] = Query(None, description="Only posts in this category id"),
+    district: Optional[str] = Query(None, description="Only posts by users in this district"),
+    week: Optional[date] = Query(None, description="Only posts from the week (Monday start) containing this date"),
+    facets: bool = Query(False, description="Also return post counts by category, district and week")
+):
     if not query or len(query) < 3:
         raise HTTPException(status_code=400, detail="Query must be at least 3 characters long")
 
-    tsquery = func.plainto_tsquery('english', query)
-    user_query = select(models.User).filter(models.User.search_vector.op('@@')(tsquery))
-    post_query = select(models.Post).filter(models.Post.search_vector.op('@@')(tsquery)).options(
-        selectinload(models.Post.owner)
-    )
-    comment_query = select(models.Comment).filter(models.Comment.search_vector.op('@@')(tsquery)).options(
-        selectinload(models.Comment.user)
-    )
-
-    user_result = await db.execute(user_query)
-    post_result = await db.execute(post_query)
-    comment_result = await db.execute(comment_query)
-
-    return schemas.SearchResponse(
-        users=user_result.scalars().all(),
-        posts=post_result.scalars().all(),
-        comments=comment_result.scalars().all()
-    )
+    filters = PostFilters(category_id=category, district=district, week=week)
+    pages = await run_search(query, parse_types(types), skip, limit, filters, facets)
+    return schemas.SearchResponse(query=query, skip=skip, limit=limit, **pages)
 
+@router.get("/suggest", response_model=schemas.SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=2, max_length=64, description="Prefix as typed, e.g. '@kyag' without the @"),
+    types: Optional[List[str]] = Query(None, description="users, posts and/or groups; comma-separated or repeated"),
+    role: Optional[schemas.Role] = Query(None, description="Only suggest users with this role, e.g. mp"),
+    limit: int = Query(5, ge=1, le=settings.search_suggest_max_limit)
+):
+    """Live typeahead for @mentions, MPs and groups: prefix matches on names, per type."""
+    lists = await run_suggest(q.strip().lstrip("@"), parse_types(types, SUGGEST_TYPES), limit, role)
+    return schemas.SuggestResponse(**lists)
 
 
 # from fastapi import FastAPI, Depends, HTTPException, APIRouter
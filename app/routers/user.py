@@ -2,12 +2,12 @@ from typing import Optional
 from functools import partial
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from .. import models, schemas
+from .. import schemas
 from ..database import get_db
 from ..routers.permissions import require_role
-from ..utils import hash
-from ..ug_locale import uga_locale
+from ..utils import hash_async
+from ..ug_locale import uga_locale, InvalidLocation
+from ..provisioning import create_account
 import secrets
 import os
 from datetime import date
@@ -16,6 +16,21 @@ import logging
 router = APIRouter(prefix="/users", tags=["Users"])
 logger = logging.getLogger(__name__)
 
+def profile_image_path(profile_image: Optional[UploadFile]) -> Optional[str]:
+    if not (profile_image and profile_image.filename):
+        return None
+    if not profile_image.content_type.startswith('image/'):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
+    return f"Uploads/{secrets.token_hex(8)}_{profile_image.filename}"
+
+async def save_profile_image(profile_image: Optional[UploadFile], file_path: Optional[str]):
+    if not file_path:
+        return
+    os.makedirs("Uploads", exist_ok=True)
+    with open(file_path, "wb") as buffer:
+        content = await profile_image.read()
+        buffer.write(content)
+
 @router.post("/signup", status_code=status.HTTP_201_CREATED, response_model=schemas.UserOut)
 async def signup(
     signup_data: schemas.UserSignup,
@@ -28,52 +43,24 @@ async def signup(
     if user.password != user.confirm_password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Passwords do not match")
 
-    # Validate email uniqueness
-    if user.email:
-        email_query = select(models.User).where(models.User.email == user.email)
-        result = await db.execute(email_query)
-        if result.scalar_one_or_none():
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-
     # Validate location fields
-    district = uga_locale.find_district_by_id(user.district)
-    if not district or "name" not in district:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid district ID: {user.district}")
-
-    county = uga_locale.find_county_by_id(user.constituency)
-    if not county or "name" not in county or county["district"] != user.district:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid constituency ID: {user.constituency}")
-
-    subcounty = uga_locale.find_subcounty_by_id(user.sub_county)
-    if not subcounty or "name" not in subcounty or subcounty["county"] != user.constituency:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid sub-county ID: {user.sub_county}")
+    uga_locale.require_ready()
+    try:
+        district, county, subcounty, parish = uga_locale.resolve_chain(
+            user.district, user.constituency, user.sub_county, user.parish
+        )
+    except InvalidLocation as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    parish = uga_locale.find_parish_by_id(user.parish)
-    if not parish or "name" not in parish or parish["subcounty"] != user.sub_county:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid parish ID: {user.parish}")
-
-    # Use provided username
     username = user.username
-    username_query = select(models.User).where(models.User.username == username)
-    result = await db.execute(username_query)
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already registered")
 
-    # Handle profile image
-    profile_image_url = None
-    if profile_image and profile_image.filename:
-        if not profile_image.content_type.startswith('image/'):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
-        os.makedirs("Uploads", exist_ok=True)
-        file_path = f"Uploads/{secrets.token_hex(8)}_{profile_image.filename}"
-        with open(file_path, "wb") as buffer:
-            content = await profile_image.read()
-            buffer.write(content)
-        profile_image_url = f"/Uploads/{os.path.basename(file_path)}"
+    # Handle profile image (written only once the user row exists)
+    file_path = profile_image_path(profile_image)
+    profile_image_url = f"/Uploads/{os.path.basename(file_path)}" if file_path else None
 
-    # Create user
-    hashed_password = hash(user.password)
-    db_user = models.User(
+    # Create user: uniqueness is enforced by the INSERT itself, nin comes from the database
+    hashed_password = await hash_async(user.password)
+    db_user = await create_account(db, dict(
         username=username,
         full_name=f"{user.first_name} {user.last_name}",
         email=user.email,
@@ -94,19 +81,11 @@ async def signup(
         notification_push=user.notifications.push,
         profile_image=profile_image_url,
         role=schemas.Role.CITIZEN,
-        nin=f"NIN-temp-{username}",
         gender=user.gender,
         date_of_birth=user.date_of_birth or date(2000, 1, 1),
         phone_number=user.phone_number
-    )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-
-    # Update nin
-    db_user.nin = f"NIN{db_user.id}-{db_user.created_at.strftime('%Y%m%d%H%M%S')}"
-    await db.commit()
-    await db.refresh(db_user)
+    ))
+    await save_profile_image(profile_image, file_path)
 
     return db_user
 
@@ -125,51 +104,22 @@ async def create_user(
     if user.password != user.confirm_password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Passwords do not match")
 
-    # Validate email uniqueness
-    if user.email:
-        email_query = select(models.User).where(models.User.email == user.email)
-        result = await db.execute(email_query)
-        if result.scalar_one_or_none():
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
-
     # Validate location fields
-    district = uga_locale.find_district_by_id(user.district)
-    if not district or "name" not in district:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid district ID: {user.district}")
-
-    county = uga_locale.find_county_by_id(user.constituency)
-    if not county or "name" not in county or county["district"] != user.district:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid constituency ID: {user.constituency}")
-
-    subcounty = uga_locale.find_subcounty_by_id(user.sub_county)
-    if not subcounty or "name" not in subcounty or subcounty["county"] != user.constituency:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid sub-county ID: {user.sub_county}")
-
-    parish = uga_locale.find_parish_by_id(user.parish)
-    if not parish or "name" not in parish or parish["subcounty"] != user.sub_county:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid parish ID: {user.parish}")
-
-    # Check username uniqueness
-    username_query = select(models.User).where(models.User.username == user.username)
-    result = await db.execute(username_query)
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already registered")
-
-    # Handle profile image
-    profile_image_url = None
-    if profile_image and profile_image.filename:
-        if not profile_image.content_type.startswith('image/'):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
-        os.makedirs("Uploads", exist_ok=True)
-        file_path = f"Uploads/{secrets.token_hex(8)}_{profile_image.filename}"
-        with open(file_path, "wb") as buffer:
-            content = await profile_image.read()
-            buffer.write(content)
-        profile_image_url = f"/Uploads/{os.path.basename(file_path)}"
-
-    # Create user
-    hashed_password = hash(user.password)
-    db_user = models.User(
+    uga_locale.require_ready()
+    try:
+        district, county, subcounty, parish = uga_locale.resolve_chain(
+            user.district, user.constituency, user.sub_county, user.parish
+        )
+    except InvalidLocation as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Handle profile image (written only once the user row exists)
+    file_path = profile_image_path(profile_image)
+    profile_image_url = f"/Uploads/{os.path.basename(file_path)}" if file_path else None
+
+    # Create user: uniqueness is enforced by the INSERT itself, nin comes from the database
+    hashed_password = await hash_async(user.password)
+    db_user = await create_account(db, dict(
         username=user.username,
         full_name=f"{user.first_name} {user.last_name}",
         email=user.email,
@@ -190,18 +140,10 @@ async def create_user(
         notification_push=user.notifications.push,
         profile_image=profile_image_url,
         role=user.role or schemas.Role.CITIZEN,
-        nin=f"NIN-temp-{user.username}",
         gender=user.gender or "Unknown",
         date_of_birth=user.date_of_birth or date(2000, 1, 1),
         phone_number=user.phone_number or "0000000000"
-    )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-
-    # Update nin
-    db_user.nin = f"NIN{db_user.id}-{db_user.created_at.strftime('%Y%m%d%H%M%S')}"
-    await db.commit()
-    await db.refresh(db_user)
+    ))
+    await save_profile_image(profile_image, file_path)
 
     return db_user
\ No newline at end of file
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func  # For like count
 from .. import schemas, models
 from ..database import get_db
 from .oauth2 import get_current_user  # FIXED: Import get_current_user directly
+from ..post_stats import bump_post_counters
+from ..cache import response_cache
 
 router = APIRouter(
     prefix="/votes",
@@ -46,20 +47,17 @@ async def votes(
             )
         new_vote = models.Vote(post_id=vote.post_id, user_id=current_user.id)
         db.add(new_vote)
+        # Keep the like counter in the same transaction as the vote
+        counters = await bump_post_counters(db, vote.post_id, likes=1)
         await db.commit()
-        # Get updated likes
-        like_query = select(func.count()).select_from(models.Vote).where(models.Vote.post_id == vote.post_id)
-        like_result = await db.execute(like_query)
-        likes = like_result.scalar()
-        return {"message": "Voted successfully", "likes": likes}
+        await response_cache.bump_post(post.id, post.group_id)
+        return {"message": "Voted successfully", "likes": counters["like_count"]}
     else:  # dir == 0: unvote
         if not found_vote:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vote does not exist")
 
         await db.delete(found_vote)
+        counters = await bump_post_counters(db, vote.post_id, likes=-1)
         await db.commit()
-        # Get updated likes
-        like_query = select(func.count()).select_from(models.Vote).where(models.Vote.post_id == vote.post_id)
-        like_result = await db.execute(like_query)
-        likes = like_result.scalar()
-        return {"message": "Successfully deleted vote", "likes": likes}
\ No newline at end of file
+        await response_cache.bump_post(post.id, post.group_id)
+        return {"message": "Successfully deleted vote", "likes": counters["like_count"]}
\ No newline at end of file
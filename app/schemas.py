@@ -1,9 +1,11 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, date
-from typing import Optional, List, Annotated, Union
+from typing import Optional, List, Annotated, Union, Generic, TypeVar
 from pydantic.types import conint
 from enum import Enum
 
+T = TypeVar("T")
+
 
 class PostBase(BaseModel):
     title_of_the_post: str
@@ -54,6 +56,7 @@ class UserSignup(BaseModel):  # Added to wrap UserCreate
 
 class UserOut(UserBase):
     id: int
+    full_name: Optional[str] = None
     role: Role
     is_active: bool
     created_at: datetime
@@ -146,10 +149,76 @@ class Vote(BaseModel):
     post_id: int
     dir: Annotated[int, conint(le=1)]
 
+class SearchUserHit(BaseModel):
+    id: int
+    username: str
+    full_name: str
+    rank: float
+
+class SearchPostHit(BaseModel):
+    id: int
+    title: str
+    content: str
+    created_at: datetime
+    owner_id: int
+    owner_username: str
+    rank: float
+
+class SearchCommentHit(BaseModel):
+    id: int
+    content: str
+    created_at: datetime
+    post_id: int
+    user_id: int
+    rank: float
+
+class SearchPage(BaseModel, Generic[T]):
+    items: List[T]
+    has_more: bool
+
+class FacetCount(BaseModel):
+    value: Union[int, date, str]
+    label: Optional[str] = None
+    count: int
+
+class SearchFacets(BaseModel):
+    # Matching posts counted; truncated when the cap was reached and counts are partial
+    matched: int
+    truncated: bool
+    category: List[FacetCount]
+    district: List[FacetCount]
+    week: List[FacetCount]
+
 class SearchResponse(BaseModel):
-    users: List[UserOut]
-    posts: List[Post]
-    comments: List['CommentResponse']
+    query: str
+    skip: int
+    limit: int
+    # Types left out of the `types` filter are null
+    users: Optional[SearchPage[SearchUserHit]] = None
+    posts: Optional[SearchPage[SearchPostHit]] = None
+    comments: Optional[SearchPage[SearchCommentHit]] = None
+    # Only with facets=true
+    facets: Optional[SearchFacets] = None
+
+class SuggestUser(BaseModel):
+    id: int
+    username: str
+    full_name: str
+    role: Role
+
+class SuggestPost(BaseModel):
+    id: int
+    title: str
+
+class SuggestGroup(BaseModel):
+    id: int
+    name: str
+
+class SuggestResponse(BaseModel):
+    # Types left out of the `types` filter are null
+    users: Optional[List[SuggestUser]] = None
+    posts: Optional[List[SuggestPost]] = None
+    groups: Optional[List[SuggestGroup]] = None
 
 class CommentBase(BaseModel):
     content: str
@@ -0,0 +1,361 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy import Text, case, cast, distinct, func, literal, literal_column, or_, select, tuple_, union
+from sqlalchemy.dialects.postgresql import TSQUERY
+from . import models, schemas
+from .cache import MemoryBackend
+from .config import settings
+from .database import AsyncSessionLocal
+
+# Entity types searchable through /search, in response order
+SEARCH_TYPES = ("users", "posts", "comments")
+
+
+class QueryCache:
+    """
+    Small per-process TTL + LRU cache of query results with single-flight: while a key is being
+    computed, identical requests wait for that one computation instead of each hitting the
+    database. Results are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.backend = MemoryBackend(max_entries=max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl <= 0:
+            return await compute()
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._compute(key, compute))
+            self._inflight[key] = task
+        # Shielded so a client disconnecting doesn't cancel the query for everyone waiting on it
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            await self.backend.set(key, value, self.ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            # Share of lookups answered without their own query
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "in_flight": len(self._inflight),
+            "entries": self.backend.size(),
+            "evictions": self.backend.evictions,
+            "ttl_seconds": self.ttl
+        }
+
+
+# Raw query text -> normalized tsquery text. Normalization only changes with the text search config.
+tsquery_cache = QueryCache(ttl=3600, max_entries=settings.search_cache_entries)
+search_cache = QueryCache(ttl=settings.search_cache_ttl_seconds, max_entries=settings.search_cache_entries)
+
+
+async def _tsquery_text(query: str) -> str:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(cast(func.plainto_tsquery("english", query), Text))) or ""
+
+
+async def normalize_query(query: str) -> str:
+    """
+    The tsquery Postgres builds for `query`: lowercased, stemmed, stopwords dropped, e.g.
+    "The Budgets of Uganda" -> 'budget' & 'uganda'. Postgres does it so the cache key can
+    never disagree with what the search matches. Empty when only stopwords remain.
+    """
+    text = " ".join(query.lower().split())
+    return await tsquery_cache.get_or_compute(text, lambda: _tsquery_text(text))
+
+
+def search_tsquery(normalized: str):
+    """The normalized tsquery text back as a tsquery; already stemmed, so no config is applied again."""
+    return cast(literal(normalized, Text), TSQUERY)
+
+
+def _ranked(model, columns: list, tsquery):
+    """Rows of `model` matching tsquery (a GIN index probe), best ts_rank first, newest id on ties."""
+    rank = func.ts_rank(model.search_vector, tsquery)
+    return (
+        select(*columns, rank.label("rank"))
+        .where(model.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc(), model.id.desc())
+    )
+
+
+def user_search_query(tsquery):
+    return _ranked(models.User, [models.User.id, models.User.username, models.User.full_name], tsquery)
+
+
+def post_search_query(tsquery):
+    # Owner's username comes from the join; no owner objects are loaded
+    return _ranked(models.Post, [
+        models.Post.id,
+        models.Post.title,
+        models.Post.content,
+        models.Post.created_at,
+        models.Post.owner_id,
+        models.User.username.label("owner_username")
+    ], tsquery).join(models.User, models.User.id == models.Post.owner_id)
+
+
+def comment_search_query(tsquery):
+    return _ranked(models.Comment, [
+        models.Comment.id,
+        models.Comment.content,
+        models.Comment.created_at,
+        models.Comment.post_id,
+        models.Comment.user_id
+    ], tsquery)
+
+
+SEARCH_QUERIES = {
+    "users": user_search_query,
+    "posts": post_search_query,
+    "comments": comment_search_query,
+}
+
+
+class PostFilters(NamedTuple):
+    """Narrowing of post results by facet value; every post query joins the owner for `district`."""
+    category_id: Optional[int] = None
+    district: Optional[str] = None
+    week: Optional[date] = None
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.category_id is not None:
+            clauses.append(models.Post.id.in_(
+                select(models.post_categories.c.post_id).where(models.post_categories.c.category_id == self.category_id)
+            ))
+        if self.district is not None:
+            clauses.append(models.User.district == self.district)
+        if self.week is not None:
+            # Weeks start on Monday, like date_trunc('week', ...) in the facet counts
+            start = self.week - timedelta(days=self.week.weekday())
+            clauses += [models.Post.created_at >= start, models.Post.created_at < start + timedelta(days=7)]
+        return clauses
+
+    def key(self) -> str:
+        return f"{self.category_id or ''}|{self.district or ''}|{self.week or ''}"
+
+
+def post_facets_query(tsquery, filters: PostFilters, cap: int):
+    """
+    Facet counts for matching posts in one statement: up to `cap` matches are collected once,
+    then counted by category, by the owner's district and by week with GROUPING SETS, plus
+    the overall total. count(DISTINCT id) keeps posts in several categories from inflating
+    the district, week and total counts.
+    """
+    matched = (
+        select(
+            models.Post.id,
+            models.User.district,
+            func.date_trunc(literal_column("'week'"), models.Post.created_at).label("week")
+        )
+        .join(models.User, models.User.id == models.Post.owner_id)
+        .where(models.Post.search_vector.op("@@")(tsquery), *filters.clauses())
+        .limit(cap)
+        .cte("matched")
+    )
+    week = matched.c.week
+    category_id, category = models.Category.id, models.Category.name
+    return (
+        select(
+            category_id.label("category_id"),
+            category.label("category"),
+            matched.c.district,
+            week,
+            func.count(distinct(matched.c.id)).label("count"),
+            func.grouping(category_id, matched.c.district, week).label("grouping")
+        )
+        .select_from(matched)
+        .outerjoin(models.post_categories, models.post_categories.c.post_id == matched.c.id)
+        .outerjoin(models.Category, models.Category.id == models.post_categories.c.category_id)
+        .group_by(func.grouping_sets(
+            tuple_(category_id, category), tuple_(matched.c.district), tuple_(week), tuple_()
+        ))
+    )
+
+
+# GROUPING(category_id, district, week) bitmask of each grouping set: a set bit means "not grouped by"
+FACET_CATEGORY, FACET_DISTRICT, FACET_WEEK, FACET_TOTAL = 0b011, 0b101, 0b110, 0b111
+
+
+async def post_facets(normalized: str, filters: PostFilters) -> dict:
+    cap = settings.search_facet_max_matches
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(post_facets_query(search_tsquery(normalized), filters, cap))
+        rows = result.all()
+    facets = {"matched": 0, "truncated": False, "category": [], "district": [], "week": []}
+    for row in rows:
+        if row.grouping == FACET_TOTAL:
+            facets["matched"] = row.count
+            facets["truncated"] = row.count >= cap
+        elif row.grouping == FACET_CATEGORY and row.category_id is not None:
+            facets["category"].append({"value": row.category_id, "label": row.category, "count": row.count})
+        elif row.grouping == FACET_DISTRICT and row.district is not None:
+            facets["district"].append({"value": row.district, "count": row.count})
+        elif row.grouping == FACET_WEEK and row.week is not None:
+            facets["week"].append({"value": row.week.date(), "count": row.count})
+    facets["category"].sort(key=lambda bucket: -bucket["count"])
+    facets["district"].sort(key=lambda bucket: -bucket["count"])
+    facets["week"].sort(key=lambda bucket: bucket["value"], reverse=True)
+    return facets
+
+
+async def search_type(kind: str, normalized: str, skip: int, limit: int, filters: PostFilters = PostFilters()) -> dict:
+    """One page of one entity type, on its own session so the types can run side by side."""
+    statement = SEARCH_QUERIES[kind](search_tsquery(normalized))
+    if kind == "posts":
+        statement = statement.where(*filters.clauses())
+    statement = statement.offset(skip).limit(limit + 1)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(statement)
+        rows = result.mappings().all()
+    return {"items": [dict(row) for row in rows[:limit]], "has_more": len(rows) > limit}
+
+
+async def run_search(
+    query: str,
+    types: List[str],
+    skip: int,
+    limit: int,
+    filters: PostFilters = PostFilters(),
+    facets: bool = False
+) -> Dict[str, dict]:
+    """
+    Search the requested types concurrently; each takes one pooled connection for one query.
+    Pages are cached per type under the normalized tsquery, so "Budget", "budgets" and
+    "the budget" share one entry and one in-flight query. `filters` narrow posts only;
+    with `facets`, post facet counts are computed alongside and returned under "facets".
+    """
+    normalized = await normalize_query(query)
+    if not normalized:
+        empty = {kind: {"items": [], "has_more": False} for kind in types}
+        if facets:
+            empty["facets"] = {"matched": 0, "truncated": False, "category": [], "district": [], "week": []}
+        return empty
+
+    def page(kind: str):
+        post_key = f":{filters.key()}" if kind == "posts" else ""
+        key = f"{kind}{post_key}:{skip}:{limit}:{normalized}"
+        return search_cache.get_or_compute(key, lambda: search_type(kind, normalized, skip, limit, filters))
+
+    names = list(types)
+    work = [page(kind) for kind in types]
+    if facets:
+        names.append("facets")
+        work.append(search_cache.get_or_compute(
+            f"facets:{filters.key()}:{normalized}", lambda: post_facets(normalized, filters)
+        ))
+    results = await asyncio.gather(*work)
+    return dict(zip(names, results))
+
+
+# Entity types offered by /search/suggest, in response order
+SUGGEST_TYPES = ("users", "posts", "groups")
+
+
+def like_prefix(text: str) -> str:
+    """Escape LIKE wildcards; underscores are common in usernames."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _suggestions(model, columns: list, match_columns: list, text: str, limit: int, *filters):
+    """
+    Names starting with `text` (or, for multi-word names, with a word starting with it), via the
+    pg_trgm GIN indexes. Prefix hits on the first column and the remaining matches are each capped
+    at SEARCH_SUGGEST_CANDIDATES, shortest first, so a one-letter-wide prefix can't sort half the
+    table and word-internal hits can't crowd out prefix hits. Ranking: prefix hits on the first
+    column first, then trigram similarity, then shorter names.
+    """
+    prefix = like_prefix(text)
+    primary = match_columns[0]
+    conditions = [primary.ilike(f"% {prefix}%")]
+    for column in match_columns[1:]:
+        conditions += [column.ilike(f"{prefix}%"), column.ilike(f"% {prefix}%")]
+    cap = settings.search_suggest_candidates
+    shortest = (func.length(primary), model.id)
+    prefix_hits = select(model.id).where(primary.ilike(f"{prefix}%"), *filters).order_by(*shortest).limit(cap)
+    other_hits = select(model.id).where(or_(*conditions), *filters).order_by(*shortest).limit(cap)
+    candidates = union(prefix_hits, other_hits).subquery()
+    similarities = [func.similarity(column, text) for column in match_columns]
+    similarity = func.greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    return (
+        select(*columns)
+        .where(model.id.in_(select(candidates.c.id)))
+        .order_by(case((primary.ilike(f"{prefix}%"), 0), else_=1), similarity.desc(), func.length(primary), model.id)
+        .limit(limit)
+    )
+
+
+def user_suggest_query(text: str, limit: int, role: Optional[schemas.Role] = None):
+    filters = [models.User.is_active == True]
+    if role is not None:
+        filters.append(models.User.role == role)
+    return _suggestions(
+        models.User,
+        [models.User.id, models.User.username, models.User.full_name, models.User.role],
+        [models.User.username, models.User.full_name],
+        text, limit, *filters
+    )
+
+
+def post_suggest_query(text: str, limit: int, role: Optional[schemas.Role] = None):
+    return _suggestions(models.Post, [models.Post.id, models.Post.title], [models.Post.title], text, limit)
+
+
+def group_suggest_query(text: str, limit: int, role: Optional[schemas.Role] = None):
+    return _suggestions(models.Group, [models.Group.id, models.Group.name], [models.Group.name], text, limit)
+
+
+SUGGEST_QUERIES = {
+    "users": user_suggest_query,
+    "posts": post_suggest_query,
+    "groups": group_suggest_query,
+}
+
+
+# Typeahead traffic is dominated by a few short prefixes, which stay resident; the rest age out
+suggestion_cache = QueryCache(
+    ttl=settings.search_suggest_cache_ttl_seconds,
+    max_entries=settings.search_suggest_cache_entries
+)
+
+
+async def _suggest_rows(kind: str, text: str, limit: int, role: Optional[schemas.Role]) -> List[dict]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(SUGGEST_QUERIES[kind](text, limit, role))
+        return [dict(row) for row in result.mappings().all()]
+
+
+async def suggest_type(kind: str, text: str, limit: int, role: Optional[schemas.Role]) -> List[dict]:
+    # The role filter only applies to users
+    key = f"{kind}:{role.value if role and kind == 'users' else ''}:{limit}:{text.lower()}"
+    return await suggestion_cache.get_or_compute(key, lambda: _suggest_rows(kind, text, limit, role))
+
+
+async def run_suggest(text: str, types: List[str], limit: int, role: Optional[schemas.Role] = None) -> Dict[str, List[dict]]:
+    """Per-type suggestions, each type cached separately and queried concurrently on a miss."""
+    lists = await asyncio.gather(*(suggest_type(kind, text, limit, role) for kind in types))
+    return dict(zip(types, lists))
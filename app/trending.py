@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import math
+from datetime import timedelta
+from sqlalchemy import update, func, case, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Engagement weights
+VIEW_WEIGHT = 0.5
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.5
+
+# Scores are stored as log2(sum of weight * 2 ** (halflives since TRENDING_EPOCH)).
+# Every score is relative to the same fixed instant, so time passing never
+# reorders posts and nothing has to rewrite live scores; 0 means "no score".
+TRENDING_EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+
+# Decayed scores below this are treated as no longer trending
+MIN_SCORE = 0.01
+
+# Arbitrary constant so only one worker runs the periodic retirement at a time
+DECAY_LOCK_KEY = 724211
+
+HALF_LIFE_SECONDS = settings.trending_half_life_hours * 3600
+WINDOW = timedelta(days=settings.trending_window_days)
+
+LN2 = math.log(2)
+
+
+def halflives_now():
+    """Half-lives elapsed between TRENDING_EPOCH and now, as a SQL expression."""
+    return (func.extract("epoch", func.now()) - TRENDING_EPOCH) / HALF_LIFE_SECONDS
+
+
+def engagement_weight(likes: int = 0, comments: int = 0, views: int = 0) -> float:
+    return likes * LIKE_WEIGHT + comments * COMMENT_WEIGHT + views * VIEW_WEIGHT
+
+
+def _log2(value):
+    if isinstance(value, (int, float)):
+        return math.log2(value)
+    return func.ln(value) / LN2
+
+
+def _added_score(current, weight):
+    """log2(2 ** current + weight * 2 ** now), for a positive weight."""
+    added = _log2(weight) + halflives_now()
+    # Clamp the exponent so power() cannot underflow
+    gap = func.greatest(-func.abs(current - added), -60)
+    merged = func.greatest(current, added) + func.ln(1 + func.power(2.0, gap)) / LN2
+    return case((current <= 0, added), else_=merged)
+
+
+def _removed_score(current, weight: float):
+    """log2(2 ** current - weight * 2 ** now), or 0 once nothing is left."""
+    gap = _log2(weight) + halflives_now() - current
+    remaining = current + func.ln(1 - func.power(2.0, func.greatest(gap, -60))) / LN2
+    return case((current <= 0, 0), (gap >= -1e-9, 0), else_=func.greatest(remaining, 0))
+
+
+def score_update_values(weight) -> dict:
+    """
+    Column values that add `weight` (a number or a SQL expression) to a post's score.
+    Meant to be merged into an UPDATE on posts (see post_stats.bump_post_counters).
+    Only negative plain numbers are treated as removals. Posts outside the
+    trending window keep their score, which the retirement task zeroes.
+    """
+    current = models.Post.trending_score
+    in_window = models.Post.created_at >= func.now() - WINDOW
+    if isinstance(weight, (int, float)) and weight < 0:
+        new_score = _removed_score(current, -weight)
+    else:
+        new_score = _added_score(current, weight)
+    return {
+        "trending_score": case((in_window, new_score), else_=current),
+        "trending_updated_at": case((in_window, func.now()), else_=models.Post.trending_updated_at),
+    }
+
+
+async def retire_trending_scores(db: AsyncSession) -> int:
+    """
+    Zero the scores of posts that fell out of the window or decayed below
+    MIN_SCORE. Live scores are left alone. Returns the number of rows retired,
+    or -1 if another worker holds the lock.
+    """
+    locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": DECAY_LOCK_KEY})
+    if not locked.scalar():
+        await db.rollback()
+        return -1
+
+    decayed_below = models.Post.trending_score - halflives_now() < math.log2(MIN_SCORE)
+    expired = (models.Post.created_at < func.now() - WINDOW) | decayed_below
+    stmt = update(models.Post).where(models.Post.trending_score > 0, expired).values(
+        trending_score=0
+    ).execution_options(synchronize_session=False)
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+async def run_retire_loop():
+    """Background task started with the app."""
+    from .database import AsyncSessionLocal
+    while True:
+        await asyncio.sleep(settings.trending_decay_interval_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                retired = await retire_trending_scores(db)
+            logger.debug(f"Trending retirement pass retired {retired} posts")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Trending retirement pass failed: {e}")
@@ -1,64 +1,593 @@
-from typing import List, Optional
+import asyncio
+import bisect
+import gzip
+import hashlib
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import requests
-from functools import lru_cache
+from fastapi import HTTPException, status
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
+SOURCE_URL = "https://raw.githubusercontent.com/paulgrammer/ug-locale/main"
+
+# Bundled snapshot; regenerate with `python -m app.ug_locale refresh`
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "data", "ug_locale.json.gz")
+
+# Level name -> (source file, parent key). Snapshot rows are stored as [id, name(, parent)] arrays.
+LEVELS = {
+    "districts": ("districts.json", None),
+    "counties": ("counties.json", "district"),
+    "subcounties": ("subcounties.json", "county"),
+    "parishes": ("parishes.json", "subcounty"),
+    "villages": ("villages.json", "parish"),
+}
+
 class Location(BaseModel):
     id: str
     name: str
 
+def fetch_remote(base_url: str = SOURCE_URL) -> dict:
+    """Download every level from the upstream repository (network required)."""
+    session = requests.Session()
+    data = {}
+    for level, (filename, _) in LEVELS.items():
+        response = session.get(f"{base_url}/{filename}", timeout=60)
+        response.raise_for_status()
+        data[level] = response.json()
+    return data
+
+def build_snapshot(data: dict, source: str = SOURCE_URL) -> dict:
+    """Compact, versioned form of the upstream data: only id, name and parent id per row."""
+    levels = {}
+    for level, (_, parent_key) in LEVELS.items():
+        levels[level] = [
+            [str(row["id"]), row["name"]] + ([str(row[parent_key])] if parent_key else [])
+            for row in data[level]
+        ]
+    digest = hashlib.sha256(json.dumps(levels, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return {
+        "version": f"{datetime.now(timezone.utc).strftime('%Y%m%d')}-{digest[:12]}",
+        "source": source,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "levels": levels
+    }
+
+def write_snapshot(snapshot: dict, path: str = SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+class LocaleLevel:
+    """
+    One administrative level in columnar form: parallel id/name/parent-id columns (ids
+    interned, so a child's parent id shares the parent's string), an id -> row index, and a
+    CSR children index (child_start/child_rows) over the next level down.
+    """
+    __slots__ = ("name", "parent_key", "ids", "names", "parent_ids", "by_id", "child_start", "child_rows")
+
+    def __init__(self, name: str, parent_key: Optional[str], rows: List[list]):
+        self.name = name
+        self.parent_key = parent_key
+        self.ids = [sys.intern(r[0]) for r in rows]
+        self.names = [r[1] for r in rows]
+        self.parent_ids = [sys.intern(r[2]) for r in rows] if parent_key else None
+        self.by_id: Dict[str, int] = {id_: row for row, id_ in enumerate(self.ids)}
+        self.child_start = array("i")
+        self.child_rows = array("i")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index_children(self, child: "LocaleLevel"):
+        """Group the child level's rows by parent row, keeping source order within each parent."""
+        counts = [0] * (len(self) + 1)
+        parent_rows = [self.by_id.get(parent_id, -1) for parent_id in child.parent_ids]
+        for parent_row in parent_rows:
+            if parent_row >= 0:
+                counts[parent_row + 1] += 1
+        for row in range(len(self)):
+            counts[row + 1] += counts[row]
+        self.child_start = array("i", counts)
+        self.child_rows = array("i", [0] * counts[-1])
+        fill = list(counts[:-1])
+        for child_row, parent_row in enumerate(parent_rows):
+            if parent_row >= 0:
+                self.child_rows[fill[parent_row]] = child_row
+                fill[parent_row] += 1
+
+    def row(self, row: int) -> dict:
+        """The dict shape callers have always seen: id, name and the parent id under its key."""
+        item = {"id": self.ids[row], "name": self.names[row]}
+        if self.parent_key:
+            item[self.parent_key] = self.parent_ids[row]
+        return item
+
+    def get(self, id_: str) -> Optional[dict]:
+        row = self.by_id.get(id_)
+        return self.row(row) if row is not None else None
+
+    def children_rows(self, id_: str) -> array:
+        row = self.by_id.get(id_)
+        if row is None:
+            return array("i")
+        return self.child_rows[self.child_start[row]:self.child_start[row + 1]]
+
+
+# Level name as exposed in search results
+LEVEL_LABELS = {
+    "districts": "district",
+    "counties": "county",
+    "subcounties": "sub_county",
+    "parishes": "parish",
+    "villages": "village",
+}
+
+def normalize_name(name: str) -> str:
+    """Casefold, drop accents and punctuation: "Kira  Town-Council" -> "kira town council"."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(cleaned.split())
+
+
+class WordIndex:
+    """Sorted (word, row) pairs for one level; a prefix lookup is two bisects."""
+    __slots__ = ("tokens", "rows")
+
+    def __init__(self, entries: List[tuple]):
+        entries.sort()
+        self.tokens = [sys.intern(token) for token, _ in entries]
+        self.rows = array("i", [row for _, row in entries])
+
+    def prefix_rows(self, prefix: str) -> array:
+        lo = bisect.bisect_left(self.tokens, prefix)
+        hi = bisect.bisect_left(self.tokens, prefix + "\U0010ffff", lo)
+        return self.rows[lo:hi]
+
+
+class LocaleSearchIndex:
+    """
+    Prefix search over normalized names at all five levels. Each level has its own word
+    indexes, one over every name's first word and one over all its words, and there is a
+    map of whole names for exact hits.
+
+    Results rank exact names first, then names starting with the query, then other word
+    matches; within each class, higher levels first and then shorter names. Levels are
+    searched in that order, and the search stops once a class is full at some level, since
+    nothing in a lower level can outrank what it already has. Matches are never cut off in
+    alphabetical order.
+    """
+
+    def __init__(self, store: "LocaleStore"):
+        self.level_names = list(LEVELS)
+        self.normalized: Dict[str, List[str]] = {}
+        self.leading: List[WordIndex] = []
+        self.words: List[WordIndex] = []
+        self.exact: Dict[str, List[int]] = {}
+        for level_no, level in enumerate(self.level_names):
+            normalized = [normalize_name(name) for name in store.levels[level].names]
+            self.normalized[level] = normalized
+            leading, words = [], []
+            for row, name in enumerate(normalized):
+                if not name:
+                    continue
+                name_words = name.split()
+                leading.append((name_words[0], row))
+                words.extend((word, row) for word in set(name_words))
+                self.exact.setdefault(name, []).append((level_no << 24) | row)
+            self.leading.append(WordIndex(leading))
+            self.words.append(WordIndex(words))
+
+    def search(self, query: str, limit: int, levels: Optional[List[str]] = None) -> List[tuple]:
+        """Best `limit` (level, row) pairs whose name has a word starting with each query word."""
+        words = normalize_name(query).split()
+        if not words or limit <= 0:
+            return []
+        first, rest = words[0], words[1:]
+        query_text = " ".join(words)
+        level_nos = sorted(self.level_names.index(level) for level in levels) if levels else range(len(self.level_names))
+        allowed = set(level_nos)
+        seen, hits = set(), []
+
+        # Rank tuples: (class, level, name length, row); class 0 exact, 1 starts with the query, 2 word match
+        for ref in self.exact.get(query_text, ()):
+            level_no, row = ref >> 24, ref & 0xFFFFFF
+            if level_no in allowed:
+                seen.add(ref)
+                hits.append((0, level_no, len(query_text), row))
+
+        for level_no in level_nos:
+            normalized = self.normalized[self.level_names[level_no]]
+            for row in self.leading[level_no].prefix_rows(first):
+                ref = (level_no << 24) | row
+                name = normalized[row]
+                if ref not in seen and name.startswith(query_text):
+                    seen.add(ref)
+                    hits.append((1, level_no, len(name), row))
+            if len(hits) >= limit:
+                return self._best(hits, limit)
+
+        for level_no in level_nos:
+            normalized = self.normalized[self.level_names[level_no]]
+            for row in self.words[level_no].prefix_rows(first):
+                ref = (level_no << 24) | row
+                if ref in seen:
+                    continue
+                seen.add(ref)
+                name = normalized[row]
+                if rest:
+                    name_words = name.split()
+                    if not all(any(w.startswith(q) for w in name_words) for q in rest):
+                        continue
+                hits.append((2, level_no, len(name), row))
+            if len(hits) >= limit:
+                break
+        return self._best(hits, limit)
+
+    def _best(self, hits: List[tuple], limit: int) -> List[tuple]:
+        return [(self.level_names[hit[1]], hit[3]) for hit in heapq.nsmallest(limit, hits)]
+
+
+def _dump_rows(ids: List[str], names: List[str], rows) -> bytes:
+    return json.dumps(
+        [{"id": ids[row], "name": names[row]} for row in rows], separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+class LocaleStore:
+    """All five levels, linked parent -> children. Built once per snapshot, then read-only."""
+
+    def __init__(self, levels: Dict[str, List[list]]):
+        self.levels: Dict[str, LocaleLevel] = {
+            name: LocaleLevel(name, parent_key, levels.get(name, []))
+            for name, (_, parent_key) in LEVELS.items()
+        }
+        names = list(LEVELS)
+        for parent, child in zip(names, names[1:]):
+            self.levels[parent].index_children(self.levels[child])
+        self.search_index = LocaleSearchIndex(self)
+
+    def children(self, level: str, parent_id: str) -> List[dict]:
+        parent = self.levels[level]
+        child = self.levels[list(LEVELS)[list(LEVELS).index(level) + 1]]
+        return [{"id": child.ids[row], "name": child.names[row]} for row in parent.children_rows(parent_id)]
+
+    def serialize_listings(self) -> Dict[Tuple[str, str], bytes]:
+        """
+        Every /locations listing as ready-to-send JSON bytes, keyed by (parent level, parent id);
+        the district list is under ("", ""). Parents without children are left out.
+        """
+        names = list(LEVELS)
+        districts = self.levels["districts"]
+        listings = {("", ""): _dump_rows(districts.ids, districts.names, range(len(districts)))}
+        for parent_name, child_name in zip(names, names[1:]):
+            parent, child = self.levels[parent_name], self.levels[child_name]
+            for row, id_ in enumerate(parent.ids):
+                start, end = parent.child_start[row], parent.child_start[row + 1]
+                if start < end:
+                    listings[(parent_name, id_)] = _dump_rows(child.ids, child.names, parent.child_rows[start:end])
+        return listings
+
+    def path(self, level: str, row: int) -> List[dict]:
+        """Ancestry from the district down to (level, row) inclusive."""
+        names = list(LEVELS)
+        index = names.index(level)
+        path = [{"level": LEVEL_LABELS[level], "id": self.levels[level].ids[row], "name": self.levels[level].names[row]}]
+        parent_id = self.levels[level].parent_ids[row] if index else None
+        for parent_level in reversed(names[:index]):
+            parent_row = self.levels[parent_level].by_id.get(parent_id)
+            if parent_row is None:
+                break
+            parent = self.levels[parent_level]
+            path.append({"level": LEVEL_LABELS[parent_level], "id": parent.ids[parent_row], "name": parent.names[parent_row]})
+            parent_id = parent.parent_ids[parent_row] if parent.parent_ids else None
+        path.reverse()
+        return path
+
+    def search(self, query: str, limit: int = 20, levels: Optional[List[str]] = None) -> List[dict]:
+        results = []
+        for level, row in self.search_index.search(query, limit, levels):
+            results.append({
+                "level": LEVEL_LABELS[level],
+                "id": self.levels[level].ids[row],
+                "name": self.levels[level].names[row],
+                "path": self.path(level, row)
+            })
+        return results
+
+
+class InvalidLocation(ValueError):
+    """A location ID that does not exist or does not belong to its parent."""
+
+
+class LocationChain(NamedTuple):
+    district: dict
+    county: dict
+    subcounty: dict
+    parish: dict
+
+
 class UgandaLocaleComplete:
-    def __init__(self):
-        self.base_url = "https://raw.githubusercontent.com/paulgrammer/ug-locale/main"
-        self.districts_data = []
-        self.counties_data = []
-        self.subcounties_data = []
-        self.parishes_data = []
-        self.villages_data = []
-        self._load_data()
+    """
+    Uganda administrative units. Data comes from the bundled snapshot and is loaded in the
+    background at startup (start_loading), or on first use outside the app. With no snapshot
+    it falls back to downloading from upstream when UG_LOCALE_REMOTE_FALLBACK is on.
+    """
+
+    def __init__(self, snapshot_path: str = SNAPSHOT_PATH):
+        self.base_url = SOURCE_URL
+        self.snapshot_path = snapshot_path
+        self.store = LocaleStore({})
+        self.version: Optional[str] = None
+        # (etag, serialized listings), swapped as one value so the two always match
+        self._listings: Tuple[str, Dict[Tuple[str, str], bytes]] = ('""', {})
+        self.source: Optional[str] = None
+        self.error: Optional[str] = None
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        self._load_started = False
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded.is_set()
 
     def _load_data(self):
-        try:
-            print("Loading Uganda administrative data...")
-            self.districts_data = requests.get(f"{self.base_url}/districts.json").json()
-            self.counties_data = requests.get(f"{self.base_url}/counties.json").json()
-            self.subcounties_data = requests.get(f"{self.base_url}/subcounties.json").json()
-            self.parishes_data = requests.get(f"{self.base_url}/parishes.json").json()
-            self.villages_data = requests.get(f"{self.base_url}/villages.json").json()
-            print("All data loaded successfully!")
-        except Exception as e:
-            print(f"Error loading data: {e}")
-
-    @lru_cache(maxsize=None)
+        from .config import settings
+        with self._load_lock:
+            if self._loaded.is_set():
+                return
+            self._load_started = True
+            try:
+                snapshot = read_snapshot(self.snapshot_path)
+                if snapshot is not None:
+                    self.source = "snapshot"
+                elif settings.ug_locale_remote_fallback:
+                    # The snapshot is meant to ship with the code; booting from GitHub is a stopgap
+                    logger.error(f"No locale snapshot at {self.snapshot_path}, downloading from {self.base_url}. "
+                                 f"Generate and commit it with `python -m app.ug_locale refresh`.")
+                    snapshot = build_snapshot(fetch_remote(self.base_url))
+                    self.source = "remote"
+                else:
+                    logger.critical(f"No locale snapshot at {self.snapshot_path} and UG_LOCALE_REMOTE_FALLBACK is off; "
+                                    f"location endpoints will return 503. Run `python -m app.ug_locale refresh` and commit it.")
+                    raise FileNotFoundError(f"No locale snapshot at {self.snapshot_path} and remote fallback is off")
+                self._apply(snapshot)
+                self.error = None
+                self._loaded.set()
+                logger.info(f"Uganda locale data loaded ({self.source}, version {self.version}): "
+                            f"{len(self.store.levels['districts'])} districts, {len(self.store.levels['villages'])} villages")
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Error loading Uganda locale data: {e}")
+
+    def _apply(self, snapshot: dict):
+        # Build fully, then swap in one assignment so readers never see a half-built store
+        store = LocaleStore(snapshot["levels"])
+        self._listings = (f'"{snapshot["version"]}"', store.serialize_listings())
+        self.store = store
+        self.version = snapshot["version"]
+
+    def _ensure_loaded(self):
+        """Lazy path for scripts and tests; inside the app the startup task has already begun loading."""
+        if not self._load_started:
+            self._load_data()
+
+    async def _load_until_ready(self):
+        delay = 5
+        while True:
+            await asyncio.to_thread(self._load_data)
+            if self.ready:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 300)
+
+    def start_loading(self) -> asyncio.Task:
+        """Background load at startup, retried with backoff until it succeeds."""
+        self._load_started = True
+        return asyncio.create_task(self._load_until_ready())
+
+    def require_ready(self):
+        """Raise 503 while the data is still loading, rather than rejecting valid IDs."""
+        self._ensure_loaded()
+        if not self.ready:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Location data is still loading" if not self.error else "Location data unavailable",
+                headers={"Retry-After": "5"}
+            )
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "source": self.source,
+            "version": self.version,
+            "error": self.error,
+            "districts": len(self.store.levels["districts"]),
+            "villages": len(self.store.levels["villages"])
+        }
+
     def get_districts(self) -> List[dict]:
-        return [{"id": d["id"], "name": d["name"]} for d in self.districts_data]
+        self._ensure_loaded()
+        districts = self.store.levels["districts"]
+        return [{"id": id_, "name": name} for id_, name in zip(districts.ids, districts.names)]
 
-    @lru_cache(maxsize=None)
     def get_counties(self, district_id: str) -> List[dict]:
-        return [{"id": c["id"], "name": c["name"]} for c in self.counties_data if c["district"] == district_id]
+        self._ensure_loaded()
+        return self.store.children("districts", district_id)
 
-    @lru_cache(maxsize=None)
     def get_sub_counties(self, county_id: str) -> List[dict]:
-        return [{"id": sc["id"], "name": sc["name"]} for sc in self.subcounties_data if sc["county"] == county_id]
+        self._ensure_loaded()
+        return self.store.children("counties", county_id)
 
-    @lru_cache(maxsize=None)
     def get_parishes(self, sub_county_id: str) -> List[dict]:
-        return [{"id": p["id"], "name": p["name"]} for p in self.parishes_data if p["subcounty"] == sub_county_id]
+        self._ensure_loaded()
+        return self.store.children("subcounties", sub_county_id)
 
-    @lru_cache(maxsize=None)
     def get_villages(self, parish_id: str) -> List[dict]:
-        return [{"id": v["id"], "name": v["name"]} for v in self.villages_data if v["parish"] == parish_id]
+        self._ensure_loaded()
+        return self.store.children("parishes", parish_id)
+
+    def listing(self, level: str = "", parent_id: str = "") -> Optional[Tuple[str, bytes]]:
+        """
+        (etag, JSON bytes) for get_districts() (no arguments) or for the children of `parent_id`
+        at `level` (e.g. "districts" for its counties). None when there are none. Built once per
+        snapshot; the etag is the snapshot version.
+        """
+        self._ensure_loaded()
+        etag, listings = self._listings
+        body = listings.get((level, parent_id))
+        return (etag, body) if body is not None else None
 
     def find_district_by_id(self, district_id: str) -> Optional[dict]:
-        return next((d for d in self.districts_data if d["id"] == district_id), None)
+        self._ensure_loaded()
+        return self.store.levels["districts"].get(district_id)
 
     def find_county_by_id(self, county_id: str) -> Optional[dict]:
-        return next((c for c in self.counties_data if c["id"] == county_id), None)
+        self._ensure_loaded()
+        return self.store.levels["counties"].get(county_id)
 
     def find_subcounty_by_id(self, subcounty_id: str) -> Optional[dict]:
-        return next((sc for sc in self.subcounties_data if sc["id"] == subcounty_id), None)
+        self._ensure_loaded()
+        return self.store.levels["subcounties"].get(subcounty_id)
 
     def find_parish_by_id(self, parish_id: str) -> Optional[dict]:
-        return next((p for p in self.parishes_data if p["id"] == parish_id), None)
+        self._ensure_loaded()
+        return self.store.levels["parishes"].get(parish_id)
+
+    def search(self, query: str, limit: int = 20, levels: Optional[List[str]] = None) -> List[dict]:
+        """Typeahead across all levels; `levels` takes the plural level names (e.g. "parishes")."""
+        self._ensure_loaded()
+        return self.store.search(query, limit, levels)
+
+    def resolve_chain(self, district_id: str, county_id: str, subcounty_id: str, parish_id: str) -> LocationChain:
+        """
+        Check a district -> constituency -> sub-county -> parish selection in one call: four
+        dict probes plus parent checks. Raises InvalidLocation naming the first bad level.
+        """
+        self._ensure_loaded()
+        levels = self.store.levels
+        district = levels["districts"].get(district_id)
+        if district is None:
+            raise InvalidLocation(f"Invalid district ID: {district_id}")
+        county = levels["counties"].get(county_id)
+        if county is None or county["district"] != district_id:
+            raise InvalidLocation(f"Invalid constituency ID: {county_id}")
+        subcounty = levels["subcounties"].get(subcounty_id)
+        if subcounty is None or subcounty["county"] != county_id:
+            raise InvalidLocation(f"Invalid sub-county ID: {subcounty_id}")
+        parish = levels["parishes"].get(parish_id)
+        if parish is None or parish["subcounty"] != subcounty_id:
+            raise InvalidLocation(f"Invalid parish ID: {parish_id}")
+        return LocationChain(district, county, subcounty, parish)
+
+uga_locale = UgandaLocaleComplete()
+
+def _synthetic_levels() -> Dict[str, List[list]]:
+    """Roughly Uganda-sized data for benchmarking without a snapshot (~70k villages)."""
+    fanout = {"counties": 2, "subcounties": 7, "parishes": 5, "villages": 7}
+    levels = {"districts": [[f"D{i}", f"District {i}"] for i in range(146)]}
+    names = list(LEVELS)
+    for parent, child in zip(names, names[1:]):
+        levels[child] = [
+            [f"{row[0]}.{j}", f"{child.title()} {row[0]}.{j}", row[0]]
+            for row in levels[parent] for j in range(fanout[child])
+        ]
+    return levels
+
+def _benchmark(snapshot: Optional[dict], lookups: int = 20000):
+    """Compare the list-of-dicts scans this store replaced with LocaleStore: memory and lookup time."""
+    import random
+    import tracemalloc
+    levels = snapshot["levels"] if snapshot else _synthetic_levels()
+    print(", ".join(f"{len(rows)} {level}" for level, rows in levels.items()))
+
+    tracemalloc.start()
+    legacy = {
+        level: [dict(zip(["id", "name", parent_key] if parent_key else ["id", "name"], r)) for r in levels[level]]
+        for level, (_, parent_key) in LEVELS.items()
+    }
+    legacy_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    store = LocaleStore(levels)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"memory: lists of dicts {legacy_bytes / 1e6:.1f} MB, LocaleStore {store_bytes / 1e6:.1f} MB")
+
+    parishes = random.choices(levels["parishes"], k=min(lookups, 2000))
+    subcounties = {r[0]: r for r in levels["subcounties"]}
+    counties = {r[0]: r for r in levels["counties"]}
+    chains = []
+    for parish in parishes:
+        subcounty = subcounties[parish[2]]
+        county = counties[subcounty[2]]
+        chains.append((county[2], county[0], subcounty[0], parish[0]))
+
+    def legacy_chain(district_id, county_id, subcounty_id, parish_id):
+        next(d for d in legacy["districts"] if d["id"] == district_id)
+        next(c for c in legacy["counties"] if c["id"] == county_id)
+        next(sc for sc in legacy["subcounties"] if sc["id"] == subcounty_id)
+        next(p for p in legacy["parishes"] if p["id"] == parish_id)
+
+    locale = UgandaLocaleComplete()
+    locale.store, locale._load_started = store, True
+    for label, check in (("linear scans", legacy_chain), ("resolve_chain", locale.resolve_chain)):
+        started = time.perf_counter()
+        for chain in chains:
+            check(*chain)
+        elapsed = time.perf_counter() - started
+        print(f"signup validation, {label}: {elapsed / len(chains) * 1e6:.1f} us per chain")
+
+    parish_ids = [p[0] for p in parishes]
+    for label, children in (
+        ("filtered list", lambda pid: [v for v in legacy["villages"] if v["parish"] == pid]),
+        ("children index", lambda pid: store.children("parishes", pid)),
+    ):
+        started = time.perf_counter()
+        for pid in parish_ids[:200]:
+            children(pid)
+        elapsed = time.perf_counter() - started
+        print(f"villages of a parish, {label}: {elapsed / min(len(parish_ids), 200) * 1e6:.1f} us")
+
+def _main(argv: List[str]):
+    command = argv[0] if argv else "info"
+    if command == "refresh":
+        path = argv[1] if len(argv) > 1 else SNAPSHOT_PATH
+        snapshot = build_snapshot(fetch_remote())
+        write_snapshot(snapshot, path)
+        counts = ", ".join(f"{len(rows)} {level}" for level, rows in snapshot["levels"].items())
+        print(f"Wrote locale snapshot {snapshot['version']} to {path}: {counts}")
+    elif command == "info":
+        snapshot = read_snapshot()
+        if snapshot is None:
+            print(f"No snapshot at {SNAPSHOT_PATH}; run `python -m app.ug_locale refresh`")
+        else:
+            counts = ", ".join(f"{len(rows)} {level}" for level, rows in snapshot["levels"].items())
+            print(f"Snapshot {snapshot['version']} (fetched {snapshot['fetched_at']}): {counts}")
+    elif command == "bench":
+        _benchmark(read_snapshot())
+    else:
+        print("usage: python -m app.ug_locale [info | refresh [path] | bench]")
 
-uga_locale = UgandaLocaleComplete()
\ No newline at end of file
+# Out-of-band refresh: python -m app.ug_locale refresh
+# Store vs. old list scans: python -m app.ug_locale bench
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -1,8 +1,104 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash(password: str):
     return pwd_context.hash(password)
 
 def verify(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated executor so a hash or verify (100-300 ms of CPU) never
+    blocks the event loop. At most `workers + max_queue` calls may be in flight; beyond
+    that callers get a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            # bcrypt releases the GIL, so threads scale across cores; processes isolate it completely
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Password hashing queue full ({self.in_flight} in flight), shedding request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"}
+            )
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.completed += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        """Latencies include time spent waiting for a free worker."""
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.completed, 2) if self.completed else None,
+            "max_ms": round(self.max_ms, 2)
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    kind=settings.password_hash_executor
+)
+
+async def hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_async(plain_password, hashed_password) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import update, values, column, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .config import settings
+from .trending import VIEW_WEIGHT, score_update_values
+
+logger = logging.getLogger(__name__)
+
+
+async def flush_views(db: AsyncSession, counts: Dict[int, int]) -> int:
+    """
+    Apply a batch of view increments in one statement:
+    UPDATE posts SET view_count = view_count + v.n ... FROM (VALUES ...) AS v(post_id, n)
+    """
+    # Sorted so concurrent workers lock rows in the same order
+    batch = values(column("post_id", Integer), column("n", Integer), name="v").data(sorted(counts.items()))
+    stmt = update(models.Post).where(models.Post.id == batch.c.post_id).values(
+        view_count=models.Post.view_count + batch.c.n,
+        **score_update_values(batch.c.n * VIEW_WEIGHT)
+    ).execution_options(synchronize_session=False)
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+class ViewCounter:
+    """
+    In-process accumulator for post views, so GET /posts/{id} never writes.
+    Increments are merged per post and flushed every `flush_interval` seconds, as soon as
+    `max_pending` views are waiting, and on shutdown.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int, dedupe_window: int = 0):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dedupe_window = dedupe_window
+        self.pending: Dict[int, int] = defaultdict(int)
+        self.pending_total = 0
+        self.recent: Dict[Tuple[int, str], float] = {}
+        self._flush_needed = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def record(self, post_id: int, viewer: Optional[str] = None) -> bool:
+        """Count a view. Returns False if it was a repeat view from the same viewer inside the dedupe window."""
+        if self.dedupe_window and viewer is not None:
+            key = (post_id, viewer)
+            now = time.monotonic()
+            seen = self.recent.get(key)
+            if seen is not None and now - seen < self.dedupe_window:
+                return False
+            self.recent[key] = now
+
+        self.pending[post_id] += 1
+        self.pending_total += 1
+        if self.pending_total >= self.max_pending:
+            self._flush_needed.set()
+        return True
+
+    def pending_for(self, post_id: int) -> int:
+        return self.pending.get(post_id, 0)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self.pending:
+                return 0
+            batch, self.pending, self.pending_total = self.pending, defaultdict(int), 0
+            from .database import AsyncSessionLocal
+            try:
+                async with AsyncSessionLocal() as db:
+                    updated = await flush_views(db, batch)
+            except BaseException:
+                # Keep the views for the next attempt, including when the flush is cancelled
+                for post_id, n in batch.items():
+                    self.pending[post_id] += n
+                    self.pending_total += n
+                raise
+        self._prune_recent()
+        logger.debug(f"Flushed {sum(batch.values())} views across {updated} posts")
+        return updated
+
+    def _prune_recent(self):
+        if not self.recent:
+            return
+        cutoff = time.monotonic() - self.dedupe_window
+        self.recent = {key: seen for key, seen in self.recent.items() if seen >= cutoff}
+
+    async def run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"View count flush failed: {e}")
+
+    def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        # Let the loop finish its current flush and exit rather than cancelling it mid-write
+        if self._task:
+            self._stopping = True
+            self._flush_needed.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+view_counter = ViewCounter(
+    flush_interval=settings.view_flush_interval_seconds,
+    max_pending=settings.view_flush_max_pending,
+    dedupe_window=settings.view_dedupe_window_seconds
+)